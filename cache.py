@@ -5,9 +5,10 @@ Provides persistent caching with lazy TTL cleanup to replace Redis dependency.
 """
 
 import sqlite3
+import threading
 import time
 from pathlib import Path
-from typing import Optional
+from typing import Dict, Iterable, List, Optional, Tuple
 
 
 class Cache:
@@ -26,12 +27,26 @@ class Cache:
             cache_dir.mkdir(exist_ok=True)
             db_path = str(cache_dir / "context_cache.db")
         self.db_path = db_path
+
+        # One long-lived connection instead of a connect/teardown per call;
+        # the lock serializes access since worker threads share the instance
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
         self._init_db()
 
     def _init_db(self):
         """Initialize database and create cache table if it doesn't exist."""
-        with sqlite3.connect(self.db_path) as connection:
-            connection.execute("""
+        with self._lock:
+            # WAL lets concurrent readers proceed while another worker commits
+            # a write; the mode is persistent, so setting it once here covers
+            # every later connection to this database
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            # Cache entries are reproducible, so trade a little durability
+            # for not fsyncing on every write
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute("PRAGMA temp_store=MEMORY")
+
+            self._conn.execute("""
                 CREATE TABLE IF NOT EXISTS cache (
                     key TEXT PRIMARY KEY,
                     value TEXT NOT NULL,
@@ -40,9 +55,10 @@ class Cache:
             """)
 
             # Create index for efficient expiration cleanup
-            connection.execute("""
+            self._conn.execute("""
                 CREATE INDEX IF NOT EXISTS idx_expires_at ON cache(expires_at)
             """)
+            self._conn.commit()
 
     def get(self, key: str) -> Optional[str]:
         """Retrieve cached value with lazy TTL check.
@@ -55,11 +71,8 @@ class Cache:
         """
         current_time = int(time.time())
 
-        with sqlite3.connect(self.db_path) as connection:
-            cursor = connection.cursor()
-
-            # Get value and check expiration
-            cursor.execute("""
+        with self._lock:
+            cursor = self._conn.execute("""
                 SELECT value, expires_at FROM cache WHERE key = ?
             """, (key,))
 
@@ -73,12 +86,50 @@ class Cache:
             # Check if expired
             if current_time > expires_at:
                 # Lazy cleanup - remove expired entry
-                cursor.execute("DELETE FROM cache WHERE key = ?", (key,))
-                connection.commit()
+                self._conn.execute("DELETE FROM cache WHERE key = ?", (key,))
+                self._conn.commit()
                 return None
 
             return value
 
+    def get_many(self, keys: Iterable[str]) -> Dict[str, str]:
+        """Retrieve several cached values with one query.
+
+        Args:
+            keys: Cache keys to look up.
+
+        Returns:
+            Mapping of key to value for entries that exist and have not
+            expired; missing and expired keys are simply absent.
+        """
+        keys = list(keys)
+        if not keys:
+            return {}
+
+        current_time = int(time.time())
+        placeholders = ",".join("?" * len(keys))
+
+        with self._lock:
+            rows = self._conn.execute(f"""
+                SELECT key, value, expires_at FROM cache WHERE key IN ({placeholders})
+            """, keys).fetchall()
+
+            # Lazy cleanup - remove expired entries in one batched delete
+            expired: List[str] = [
+                key for key, _, expires_at in rows if current_time > expires_at
+            ]
+            if expired:
+                self._conn.execute(f"""
+                    DELETE FROM cache WHERE key IN ({",".join("?" * len(expired))})
+                """, expired)
+                self._conn.commit()
+
+        return {
+            key: value
+            for key, value, expires_at in rows
+            if current_time <= expires_at
+        }
+
     def set(self, key: str, value: str, ttl: int):
         """Store value in cache with expiration timestamp.
 
@@ -89,11 +140,28 @@ class Cache:
         """
         expires_at = int(time.time()) + ttl
 
-        with sqlite3.connect(self.db_path) as connection:
-            connection.execute("""
+        with self._lock:
+            self._conn.execute("""
                 INSERT OR REPLACE INTO cache (key, value, expires_at)
                 VALUES (?, ?, ?)
             """, (key, value, expires_at))
+            self._conn.commit()
+
+    def set_many(self, items: Iterable[Tuple[str, str]], ttl: int):
+        """Store several values in one transaction.
+
+        Args:
+            items: Iterable of (key, value) pairs.
+            ttl: Time-to-live in seconds from now, shared by all entries.
+        """
+        expires_at = int(time.time()) + ttl
+
+        with self._lock:
+            self._conn.executemany("""
+                INSERT OR REPLACE INTO cache (key, value, expires_at)
+                VALUES (?, ?, ?)
+            """, [(key, value, expires_at) for key, value in items])
+            self._conn.commit()
 
     def clear_expired(self):
         """Manually clear all expired entries.
@@ -102,15 +170,17 @@ class Cache:
         """
         current_time = int(time.time())
 
-        with sqlite3.connect(self.db_path) as connection:
-            connection.execute("""
+        with self._lock:
+            self._conn.execute("""
                 DELETE FROM cache WHERE expires_at < ?
             """, (current_time,))
+            self._conn.commit()
 
     def clear_all(self):
         """Clear all cache entries."""
-        with sqlite3.connect(self.db_path) as connection:
-            connection.execute("DELETE FROM cache")
+        with self._lock:
+            self._conn.execute("DELETE FROM cache")
+            self._conn.commit()
 
 
 # Global cache instance
@@ -2,6 +2,7 @@
 Shared configuration for Scythe Context Engine.
 """
 
+import hashlib
 import json
 import logging
 import os
@@ -9,6 +10,7 @@ import time
 from pathlib import Path
 from typing import Any, Dict, List, Optional, Sequence, Literal
 
+import orjson
 from ollama import Client
 from cache import Cache
 from openrouter_client import OpenRouterClient
@@ -43,6 +45,11 @@ cache_dir.mkdir(exist_ok=True)
 cache = Cache(str(cache_dir / "context_cache.db"))
 CACHE_TTL = _config["cache"]["ttl_seconds"]
 
+# Exact-key cache for LLM calls: re-indexing the same repo issues byte-identical
+# summary/embedding requests, so cache hits skip the network round-trip entirely
+_llm_cache = Cache(str(cache_dir / "llm_cache.db"))
+LLM_CACHE_TTL = 30 * 86400
+
 # Provider Constants
 PROVIDER: ProviderType = _config["provider"]
 
@@ -88,6 +95,10 @@ def _retry_with_backoff(func, *args, **kwargs):
             is_rate_limit = "429" in str(e) or "rate" in str(e).lower()
             if is_rate_limit and attempt < max_retries - 1:
                 delay = base_delay * (2**attempt)
+                # Prefer the server-suggested delay when the client parsed one
+                retry_after = getattr(e, "retry_after", None)
+                if retry_after:
+                    delay = max(delay, retry_after)
                 logger.warning(
                     "Rate limit hit (attempt %d/%d), retrying in %.1fs: %s",
                     attempt + 1,
@@ -102,27 +113,103 @@ def _retry_with_backoff(func, *args, **kwargs):
     return None
 
 
+def _llm_cache_key(prefix: str, *parts: Any) -> str:
+    """Build a deterministic cache key for an LLM request."""
+    payload = orjson.dumps(parts, option=orjson.OPT_SORT_KEYS, default=str)
+    return prefix + hashlib.blake2b(payload, digest_size=32).hexdigest()
+
+
+def _llm_cache_get(key: str) -> Optional[str]:
+    """Read from the LLM cache, treating cache failures as misses."""
+    try:
+        return _llm_cache.get(key)
+    except Exception as e:
+        logger.warning("LLM cache read failed: %s", e)
+        return None
+
+
+def _llm_cache_set(key: str, value: str) -> None:
+    """Write to the LLM cache, ignoring cache failures."""
+    try:
+        _llm_cache.set(key, value, LLM_CACHE_TTL)
+    except Exception as e:
+        logger.warning("LLM cache write failed: %s", e)
+
+
 def embed_texts(texts: Sequence[str], model: Optional[str] = None) -> List[List[float]]:
     chosen_model = model or _default_embedding_model()
+    texts = list(texts)
+
+    # Keyed per text so partially cached batches only fetch the misses;
+    # one batched SELECT covers the whole lookup
+    keys = [_llm_cache_key("embed_cache:", chosen_model, text) for text in texts]
+    try:
+        hits = _llm_cache.get_many(keys)
+    except Exception as e:
+        logger.warning("LLM cache read failed: %s", e)
+        hits = {}
+    embeddings: List[Optional[List[float]]] = [
+        orjson.loads(hits[key]) if key in hits else None for key in keys
+    ]
+
+    missing = [i for i, embedding in enumerate(embeddings) if embedding is None]
+    if not missing:
+        return embeddings
+
+    # Duplicate inputs (empty __init__.py files, license stubs, ...) only
+    # need to be embedded once; scatter the result to every occurrence
+    unique_texts = list(dict.fromkeys(texts[i] for i in missing))
 
     def _call():
         if PROVIDER == "openrouter":
             client = _require_openrouter()
             options = _get_openrouter_options(None, "embedding")
-            return client.embed_texts(list(texts), chosen_model, options=options)
+            return client.embed_batch(unique_texts, chosen_model, options=options)
 
         # Ollama branch
-        response = ollama_client.embed(model=chosen_model, input=list(texts))
+        response = ollama_client.embed(model=chosen_model, input=unique_texts)
         if "embeddings" not in response:
             raise ValueError("Ollama response missing 'embeddings' key.")
         return response["embeddings"]
 
-    return _retry_with_backoff(_call)
+    # The OpenRouter client returns float32 ndarray rows; OPT_SERIALIZE_NUMPY
+    # lets orjson write them without a Python-list round-trip
+    fetched = _retry_with_backoff(_call)
+    by_text = dict(zip(unique_texts, fetched))
+    # One transaction for the whole batch instead of an INSERT + COMMIT
+    # per vector; cache failures are logged and ignored like every other
+    # LLM cache write
+    try:
+        _llm_cache.set_many(
+            (
+                (
+                    _llm_cache_key("embed_cache:", chosen_model, text),
+                    orjson.dumps(
+                        embedding, option=orjson.OPT_SERIALIZE_NUMPY
+                    ).decode(),
+                )
+                for text, embedding in by_text.items()
+            ),
+            LLM_CACHE_TTL,
+        )
+    except Exception as e:
+        logger.warning("LLM cache write failed: %s", e)
+    for i in missing:
+        embeddings[i] = by_text[texts[i]]
+    return embeddings
 
 
 def embed_single(text: str, model: Optional[str] = None) -> List[float]:
-    """Generate an embedding for a single text."""
-    return embed_texts([text], model)[0]
+    """Generate an embedding for a single text.
+
+    Single-key fast path: a cache hit costs one get instead of the
+    batched lookup and scatter machinery in embed_texts.
+    """
+    chosen_model = model or _default_embedding_model()
+    hit = _llm_cache_get(_llm_cache_key("embed_cache:", chosen_model, text))
+    if hit:
+        return orjson.loads(hit)
+    return embed_texts([text], chosen_model)[0]
 
 
 def chat_completion(
@@ -151,7 +238,29 @@ def chat_completion(
             options=options or {},
         )
 
-    return _retry_with_backoff(_call)
+    # Ollama responses are SDK objects rather than JSON dicts, so only the
+    # OpenRouter branch round-trips through the cache
+    if PROVIDER != "openrouter":
+        return _retry_with_backoff(_call)
+
+    key = _llm_cache_key(
+        "chat_cache:", chosen_model, list(messages), response_format, options
+    )
+    hit = _llm_cache_get(key)
+    if hit:
+        cached = orjson.loads(hit)
+        # Entries written before failed calls were guarded may hold a
+        # serialized None; treat those as misses
+        if cached is not None:
+            return cached
+
+    response = _retry_with_backoff(_call)
+    # _retry_with_backoff returns None once rate-limit retries are
+    # exhausted; caching that would poison every later identical request
+    # for the whole TTL
+    if response is not None:
+        _llm_cache_set(key, orjson.dumps(response).decode())
+    return response
 
 
 def generate_text(
@@ -214,18 +323,27 @@ def _set_additional_properties_false(schema: Any) -> None:
                     _set_additional_properties_false(item)
 
 
+# Response formats keyed by schema name; the schemas are static, so the
+# nested wrapper dicts only need to be built once per process
+_format_cache: Dict[str, Dict[str, Any]] = {}
+
+
 def build_structured_output_format(
     schema: Dict[str, Any], schema_name: str
 ) -> Optional[Dict[str, Any]]:
-    if PROVIDER == "openrouter":
-        # Ensure schema is strict-compliant
-        _set_additional_properties_false(schema)
-        return {
-            "type": "json_schema",
-            "json_schema": {"name": schema_name, "strict": True, "schema": schema},
-        }
-    # Ollama accepts the raw schema for its 'format' parameter
-    return schema
+    if schema_name not in _format_cache:
+        if PROVIDER == "openrouter":
+            # Ensure schema is strict-compliant
+            _set_additional_properties_false(schema)
+            _format_cache[schema_name] = {
+                "type": "json_schema",
+                "json_schema": {"name": schema_name, "strict": True, "schema": schema},
+            }
+        else:
+            # Ollama accepts the raw schema for its 'format' parameter
+            _format_cache[schema_name] = schema
+    # Shallow copy so callers can't mutate the cached dict
+    return dict(_format_cache[schema_name])
 
 
 def extract_chat_content(response: Any) -> Optional[str]:
@@ -244,9 +362,29 @@ def extract_chat_content(response: Any) -> Optional[str]:
     return None
 
 
+def _worker_count(env_var: str) -> int:
+    """Resolve a worker-pool size from the environment.
+
+    The pools gated by these knobs spend their time blocked on LLM/embedding
+    HTTP calls, so the default is well above the CPU count.
+    """
+    value = os.environ.get(env_var)
+    if value:
+        try:
+            return max(1, int(value))
+        except ValueError:
+            logger.warning("Ignoring invalid %s=%r", env_var, value)
+    return max(1, (os.cpu_count() or 1) * 5)
+
+
+# Worker-pool sizes for the I/O-bound indexing stages
+FILE_WORKERS = _worker_count("SCYTHE_FILE_WORKERS")
+FOLDER_WORKERS = _worker_count("SCYTHE_FOLDER_WORKERS")
+EMBED_WORKERS = _worker_count("SCYTHE_EMBED_WORKERS")
+
 # Exported Constants
 SUMMARIZATION_MODEL = _default_chat_model()
 EMBEDDING_MODEL = _default_embedding_model()
 SUPPORTED_LANGS = _config["indexing"]["supported_languages"]
-IGNORED_DIRS = set(_config["indexing"]["ignored_dirs"])
-IGNORED_FILES = set(_config["indexing"]["ignored_files"])
+IGNORED_DIRS = frozenset(_config["indexing"]["ignored_dirs"])
+IGNORED_FILES = frozenset(_config["indexing"]["ignored_files"])
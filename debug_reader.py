@@ -1,54 +1,45 @@
 """
-Debug reader for chunks.pkl files generated by index_repo.py.
+Debug reader for the chunk stores generated by index_repo.py.
 
-This script loads and displays the contents of a chunks.pkl file in a readable format,
-organizing chunks by type (code chunks, file summaries, folder summaries) with relevant metadata.
+This script loads and displays the contents of an index's chunk store in a readable
+format, organizing chunks by type (code chunks, file summaries, folder summaries)
+with relevant metadata.
 """
 
-import pickle
+from pathlib import Path
 from typing import Dict, List, Any
 from collections import defaultdict
 
+from indexer.embedder import load_all_chunks
 
-def load_chunks(chunks_file_path: str) -> List[Dict[str, Any]]:
+
+def load_chunks(chunks_path: str) -> List[Dict[str, Any]]:
     """
-    Load chunks from a pickle file.
+    Load chunks from an index directory or chunk store file.
+
+    Accepts the index directory itself or a path to its chunks.bin /
+    chunks.idx / legacy chunks.pkl file; newer indexes store one pickle
+    blob per chunk alongside an offset table, and load_all_chunks
+    handles both layouts.
 
     Args:
-        chunks_file_path: Path to the chunks.pkl file
+        chunks_path: Path to the index directory or a chunk store file within it
 
     Returns:
         List of chunk dictionaries containing 'text' and 'metadata' keys
     """
+    path = Path(chunks_path)
+    index_prefix = path if path.is_dir() else path.parent
     try:
-        with open(chunks_file_path, "rb") as file_handle:
-            chunks = pickle.load(file_handle)
-        return chunks
+        return load_all_chunks(str(index_prefix))
     except FileNotFoundError:
-        print(f"Error: File '{chunks_file_path}' not found.")
+        print(f"Error: no chunk store found in '{index_prefix}'.")
         return []
     except Exception as error:
         print(f"Error loading chunks: {error}")
         return []
 
 
-def categorize_chunks(chunks: List[Dict[str, Any]]) -> Dict[str, List[Dict[str, Any]]]:
-    """
-    Categorize chunks by their level type.
-
-    Args:
-        chunks: List of chunk dictionaries
-
-    Returns:
-        Dictionary grouping chunks by level (code_chunk, file_summary, folder_summary)
-    """
-    categorized = defaultdict(list)
-    for chunk in chunks:
-        level = chunk.get("metadata", {}).get("level", "unknown")
-        categorized[level].append(chunk)
-    return categorized
-
-
 def display_code_chunk(chunk: Dict[str, Any], index: int) -> None:
     """
     Display a code chunk with its metadata.
@@ -111,12 +102,41 @@ def display_folder_summary(chunk: Dict[str, Any], index: int) -> None:
     print("-" * 50)
 
 
+def display_unknown_chunk(chunk: Dict[str, Any], index: int) -> None:
+    """
+    Display a chunk with an unrecognized level.
+
+    Args:
+        chunk: Chunk dictionary containing text and metadata
+        index: Index number for display
+    """
+    print(f"\n--- Unknown Chunk #{index} ---")
+    print(f"Metadata: {chunk.get('metadata', {})}")
+    print("Content:")
+    print("-" * 50)
+    print(chunk.get("text", ""))
+    print("-" * 50)
+
+
+# Section header and display handler per chunk level
+CHUNK_HANDLERS = {
+    "code_chunk": ("CODE CHUNKS", display_code_chunk),
+    "file_summary": ("FILE SUMMARIES", display_file_summary),
+    "folder_summary": ("FOLDER SUMMARIES", display_folder_summary),
+    "unknown": ("UNKNOWN CHUNKS", display_unknown_chunk),
+}
+
+
 def display_chunks(chunks_file_path: str) -> None:
     """
-    Load and display chunks from a pickle file in a organized manner.
+    Load and display chunks from an index's chunk store in a organized manner.
+
+    A single pass routes each chunk to its display handler instead of
+    first grouping everything into per-category lists; section headers
+    are printed on the first chunk of each category and totals at the end.
 
     Args:
-        chunks_file_path: Path to the chunks.pkl file
+        chunks_file_path: Path to the index directory or a chunk store file
     """
     chunks = load_chunks(chunks_file_path)
 
@@ -127,48 +147,29 @@ def display_chunks(chunks_file_path: str) -> None:
     print(f"Loaded {len(chunks)} chunks from {chunks_file_path}")
     print("=" * 80)
 
-    categorized = categorize_chunks(chunks)
-
-    # Display code chunks
-    if "code_chunk" in categorized:
-        print(f"\nCODE CHUNKS ({len(categorized['code_chunk'])} total)")
-        print("=" * 80)
-        for index, chunk in enumerate(categorized["code_chunk"], 1):
-            display_code_chunk(chunk, index)
-
-    # Display file summaries
-    if "file_summary" in categorized:
-        print(f"\nFILE SUMMARIES ({len(categorized['file_summary'])} total)")
-        print("=" * 80)
-        for index, chunk in enumerate(categorized["file_summary"], 1):
-            display_file_summary(chunk, index)
-
-    # Display folder summaries
-    if "folder_summary" in categorized:
-        print(f"\nFOLDER SUMMARIES ({len(categorized['folder_summary'])} total)")
-        print("=" * 80)
-        for index, chunk in enumerate(categorized["folder_summary"], 1):
-            display_folder_summary(chunk, index)
-
-    # Display unknown chunks if any
-    if "unknown" in categorized:
-        print(f"\nUNKNOWN CHUNKS ({len(categorized['unknown'])} total)")
-        print("=" * 80)
-        for index, chunk in enumerate(categorized["unknown"], 1):
-            print(f"\n--- Unknown Chunk #{index} ---")
-            print(f"Metadata: {chunk.get('metadata', {})}")
-            print("Content:")
-            print("-" * 50)
-            print(chunk.get("text", ""))
-            print("-" * 50)
+    counts: Dict[str, int] = defaultdict(int)
+    for chunk in chunks:
+        level = chunk.get("metadata", {}).get("level", "unknown")
+        header, handler = CHUNK_HANDLERS.get(level, CHUNK_HANDLERS["unknown"])
+
+        counts[level] += 1
+        if counts[level] == 1:
+            print(f"\n{header}")
+            print("=" * 80)
+        handler(chunk, counts[level])
+
+    print("\n" + "=" * 80)
+    for level, count in counts.items():
+        header = CHUNK_HANDLERS.get(level, CHUNK_HANDLERS["unknown"])[0]
+        print(f"{header}: {count} total")
 
 
 if __name__ == "__main__":
     import sys
 
     if len(sys.argv) != 2:
-        print("Usage: python debug_reader.py <chunks.pkl file path>")
-        print("Example: python debug_reader.py test/chunks.pkl")
+        print("Usage: python debug_reader.py <index directory or chunks file path>")
+        print("Example: python debug_reader.py repo_index")
         sys.exit(1)
 
     chunks_file = sys.argv[1]
@@ -8,7 +8,6 @@ Usage: python index_repo.py /path/to/repo --output repo_index
 
 import argparse
 import json
-import pickle
 from pathlib import Path
 
 from line_profiler import profile
@@ -19,7 +18,7 @@ from indexer.file_processor import (
     hash_file,
     process_files,
 )
-from indexer.embedder import create_faiss_index, save_index
+from indexer.embedder import create_faiss_index, load_all_chunks, save_index
 
 
 @profile
@@ -43,12 +42,13 @@ def index_repo(
     # 1. Load existing state if available
     old_chunks = []
     old_hashes = {}
-    if (output_path / "chunks.pkl").exists() and (output_path / "meta.json").exists():
+    if (
+        (output_path / "chunks.idx").exists() or (output_path / "chunks.pkl").exists()
+    ) and (output_path / "meta.json").exists():
         if not quiet:
             print("Loading existing index for incremental update...")
         try:
-            with open(output_path / "chunks.pkl", "rb") as f:
-                old_chunks = pickle.load(f)
+            old_chunks = load_all_chunks(output_prefix)
             with open(output_path / "meta.json", "r") as f:
                 meta = json.load(f)
                 old_hashes = meta.get("file_hashes", {})
@@ -4,8 +4,9 @@ AST parsing and chunk extraction using tree-sitter.
 
 import sys
 import traceback
-from typing import Dict, List, Optional
+from typing import Dict, Iterator, Optional
 
+import tiktoken
 import tree_sitter_python
 import tree_sitter_javascript
 import tree_sitter_typescript
@@ -19,6 +20,35 @@ from tree_sitter import Language, Parser, Node
 from line_profiler import profile
 
 
+_ENCODING = None
+
+
+def _get_encoding():
+    """Lazily construct the tiktoken encoding used for chunk token counts."""
+    global _ENCODING
+    if _ENCODING is None:
+        _ENCODING = tiktoken.get_encoding("cl100k_base")
+    return _ENCODING
+
+
+def _text_counts(chunk_text: str) -> Dict:
+    """Precompute word and token counts for a chunk text.
+
+    Counting at index time lets the query-time prompt builders sum stored
+    values instead of re-tokenizing every chunk body.
+
+    Args:
+        chunk_text: The chunk source text to measure.
+
+    Returns:
+        Dict with "word_count" and "token_count" entries.
+    """
+    return {
+        "word_count": len(chunk_text.split()),
+        "token_count": len(_get_encoding().encode_ordinary(chunk_text)),
+    }
+
+
 # Language to tree-sitter module mapping
 LANGUAGE_MODULES = {
     "python": tree_sitter_python,
@@ -32,12 +62,108 @@ LANGUAGE_MODULES = {
 }
 
 
+# Language-specific node types extracted as code chunks
+_CHUNK_TARGETS = {
+    "python": [
+        "function_definition",
+        "class_definition",
+        "decorated_definition",
+    ],
+    "javascript": [
+        "function_declaration",
+        "class_declaration",
+        "method_definition",
+        "export_statement",
+        "lexical_declaration",
+        "variable_declaration",
+        "arrow_function",
+    ],
+    "typescript": [
+        "function_declaration",
+        "class_declaration",
+        "method_definition",
+        "export_statement",
+        "lexical_declaration",
+        "variable_declaration",
+        "interface_declaration",
+        "type_alias_declaration",
+        "enum_declaration",
+        "arrow_function",
+    ],
+    "java": [
+        "method_declaration",
+        "class_declaration",
+        "interface_declaration",
+    ],
+    "cpp": ["function_definition", "class_specifier", "struct_specifier"],
+    "c": ["function_definition", "struct_specifier"],
+    "go": ["function_declaration", "method_declaration", "type_declaration"],
+    "rust": [
+        "function_item",
+        "impl_item",
+        "struct_item",
+        "trait_item",
+        "enum_item",
+    ],
+}
+
+_DEFAULT_TARGETS = ["function_definition", "class_definition"]
+
+# Query strings pre-joined at import time; get_query only pays for
+# compilation (once per language), never string assembly
+_QUERY_STRINGS = {
+    lang: "\n".join(f"({node_type}) @node" for node_type in node_types)
+    for lang, node_types in _CHUNK_TARGETS.items()
+}
+
+_DEFAULT_QUERY = "\n".join(f"({node_type}) @node" for node_type in _DEFAULT_TARGETS)
+
+# Declaration types unwrapped from inside an export_statement (JS/TS)
+_EXPORTED_DECLARATIONS = {
+    "function_declaration",
+    "class_declaration",
+    "lexical_declaration",
+    "variable_declaration",
+}
+
+# Docstring patterns compiled once per language; matching runs in tree-sitter's
+# C engine instead of Python-level child/field attribute chains
+_DOC_QUERY_STRINGS = {
+    "python": (
+        "(function_definition body: (block . (expression_statement (string) @doc)))\n"
+        "(class_definition body: (block . (expression_statement (string) @doc)))"
+    ),
+}
+
+
+def _query_captures(query, node) -> Dict[str, list]:
+    """Run a query over a node, normalizing captures to a name -> nodes dict.
+
+    The tree-sitter Python bindings changed the captures API across
+    versions (list of pairs vs dict, Query method vs QueryCursor), so this
+    smooths over both shapes.
+    """
+    try:
+        captures = query.captures(node)
+    except AttributeError:
+        from tree_sitter import QueryCursor
+
+        captures = QueryCursor(query).captures(node)
+    if isinstance(captures, dict):
+        return captures
+    grouped: Dict[str, list] = {}
+    for captured_node, name in captures:
+        grouped.setdefault(name, []).append(captured_node)
+    return grouped
+
+
 class ParserManager:
     """Manager for caching tree-sitter parsers and queries across file processing."""
 
     _parsers = {}
     _languages = {}
     _queries = {}
+    _doc_queries = {}
 
     @classmethod
     def get_parser(cls, lang: str):
@@ -71,40 +197,42 @@ class ParserManager:
         Returns:
             Query instance for finding code chunks in the language.
         """
-        if lang not in cls._queries:
-            targets = {
-                "python": ["function_definition", "class_definition"],
-                "javascript": [
-                    "function_declaration",
-                    "class_declaration",
-                    "method_definition",
-                ],
-                "typescript": [
-                    "function_declaration",
-                    "class_declaration",
-                    "method_definition",
-                ],
-                "java": ["method_declaration", "class_declaration"],
-                "cpp": ["function_definition", "class_specifier"],
-                "c": ["function_definition"],
-                "go": ["function_declaration", "method_declaration"],
-                "rust": ["function_item", "impl_item"],
-            }
+        query = cls._queries.get(lang)
+        if query is None:
+            query = cls._languages[lang].query(
+                _QUERY_STRINGS.get(lang, _DEFAULT_QUERY)
+            )
+            cls._queries[lang] = query
 
-            node_types = targets.get(lang, ["function_definition", "class_definition"])
-            patterns = [f"({node_type}) @node" for node_type in node_types]
-            query_string = "\n".join(patterns)
-            cls._queries[lang] = cls._languages[lang].query(query_string)
+        return query
 
-        return cls._queries[lang]
+    @classmethod
+    def get_doc_query(cls, lang: str):
+        """Get or create a cached docstring query for the given language.
+
+        Args:
+            lang: Programming language identifier.
+
+        Returns:
+            Query instance for finding docstrings, or None if the language
+            has no docstring pattern.
+        """
+        if lang not in cls._doc_queries:
+            query_string = _DOC_QUERY_STRINGS.get(lang)
+            if query_string is None or cls.get_parser(lang) is None:
+                cls._doc_queries[lang] = None
+            else:
+                cls._doc_queries[lang] = cls._languages[lang].query(query_string)
 
+        return cls._doc_queries[lang]
 
-def extract_function_name(node: Node, code: str, lang: str) -> str:
+
+def extract_function_name(node: Node, code_bytes, lang: str) -> str:
     """Extract the function name from a tree-sitter node.
 
     Args:
         node: Tree-sitter node representing a function/method/class.
-        code: The source code content as a string.
+        code_bytes: The source code as UTF-8 bytes (or a memoryview of it).
         lang: Programming language identifier.
 
     Returns:
@@ -126,23 +254,44 @@ def extract_function_name(node: Node, code: str, lang: str) -> str:
         name_node = node.child_by_field_name(name_field)
 
         if name_node:
-            return code[name_node.start_byte : name_node.end_byte]
+            return str(
+                code_bytes[name_node.start_byte : name_node.end_byte],
+                "utf-8",
+                "ignore",
+            )
 
         for child in node.children:
             if child.type == "identifier":
-                return code[child.start_byte : child.end_byte]
+                return str(
+                    code_bytes[child.start_byte : child.end_byte], "utf-8", "ignore"
+                )
 
         return "unknown"
     except Exception:
         return "unknown"
 
 
-def extract_docstring(node: Node, code: str, lang: str) -> Optional[str]:
+def _strip_docstring_quotes(text: str) -> str:
+    """Remove the surrounding quotes from a Python string literal.
+
+    Slices rather than str.strip, which would eat leading/trailing quote
+    characters from the docstring body itself.
+    """
+    for quote in ('"""', "'''"):
+        if text.startswith(quote) and text.endswith(quote) and len(text) >= 6:
+            return text[3:-3].strip()
+    for quote in ('"', "'"):
+        if text.startswith(quote) and text.endswith(quote) and len(text) >= 2:
+            return text[1:-1].strip()
+    return text.strip()
+
+
+def extract_docstring(node: Node, code_bytes, lang: str) -> Optional[str]:
     """Extract the docstring from a function node.
 
     Args:
         node: Tree-sitter node representing a function/method/class.
-        code: The source code content as a string.
+        code_bytes: The source code as UTF-8 bytes (or a memoryview of it).
         lang: Programming language identifier.
 
     Returns:
@@ -150,32 +299,42 @@ def extract_docstring(node: Node, code: str, lang: str) -> Optional[str]:
     """
     try:
         if lang == "python":
-            body_node = node.child_by_field_name("body")
-            if body_node and body_node.child_count > 0:
-                first_child = body_node.children[0]
-                if first_child.type == "expression_statement":
-                    string_node = (
-                        first_child.children[0] if first_child.child_count > 0 else None
+            doc_query = ParserManager.get_doc_query(lang)
+            if doc_query is None:
+                return None
+            # The query matches anywhere in the subtree, so keep only the
+            # docstring whose definition is this node (not a nested one)
+            for string_node in _query_captures(doc_query, node).get("doc", []):
+                definition = string_node.parent.parent.parent
+                if definition == node:
+                    docstring_text = str(
+                        code_bytes[string_node.start_byte : string_node.end_byte],
+                        "utf-8",
+                        "ignore",
                     )
-                    if string_node and string_node.type == "string":
-                        docstring_text = code[
-                            string_node.start_byte : string_node.end_byte
-                        ]
-                        return docstring_text.strip('"""').strip("'''").strip()
+                    return _strip_docstring_quotes(docstring_text)
 
         elif lang in ["javascript", "typescript"]:
             for child in node.children:
                 if child.type == "comment":
-                    comment_text = code[child.start_byte : child.end_byte]
+                    comment_text = str(
+                        code_bytes[child.start_byte : child.end_byte],
+                        "utf-8",
+                        "ignore",
+                    )
                     if comment_text.startswith("/**"):
-                        return comment_text.strip("/**").strip("*/").strip()
+                        return comment_text[3:-2].strip()
 
         elif lang == "java":
             prev_sibling = node.prev_sibling
             if prev_sibling and prev_sibling.type == "comment":
-                comment_text = code[prev_sibling.start_byte : prev_sibling.end_byte]
+                comment_text = str(
+                    code_bytes[prev_sibling.start_byte : prev_sibling.end_byte],
+                    "utf-8",
+                    "ignore",
+                )
                 if comment_text.startswith("/**"):
-                    return comment_text.strip("/**").strip("*/").strip()
+                    return comment_text[3:-2].strip()
 
         return None
     except Exception:
@@ -183,179 +342,99 @@ def extract_docstring(node: Node, code: str, lang: str) -> Optional[str]:
 
 
 @profile
-def extract_chunks(code: str, lang: str, file_path: str) -> List[Dict]:
+def extract_chunks(code: str, lang: str, file_path: str) -> Iterator[Dict]:
     """Extract functions/classes via tree-sitter queries - optimized.
 
+    Chunks are yielded one at a time so callers can process each dict as
+    it is produced instead of holding a whole file's worth in memory.
+
     Args:
         code: The source code content as a string.
         lang: Programming language identifier.
         file_path: Relative path to the file being processed.
 
-    Returns:
-        List of chunk dictionaries containing code snippets and metadata.
+    Yields:
+        Chunk dictionaries containing code snippets and metadata.
     """
     try:
         # Get cached parser
         parser = ParserManager.get_parser(lang)
         if parser is None:
-            return []
+            return
 
-        # Parse once
-        tree = parser.parse(bytes(code, "utf8"))
-
-        chunks = []
-
-        # Language-specific node types to extract
-        targets = {
-            "python": [
-                "function_definition",
-                "class_definition",
-                "decorated_definition",
-            ],
-            "javascript": [
-                "function_declaration",
-                "class_declaration",
-                "method_definition",
-                "export_statement",
-                "lexical_declaration",
-                "variable_declaration",
-                "arrow_function",
-            ],
-            "typescript": [
-                "function_declaration",
-                "class_declaration",
-                "method_definition",
-                "export_statement",
-                "lexical_declaration",
-                "variable_declaration",
-                "interface_declaration",
-                "type_alias_declaration",
-                "enum_declaration",
-                "arrow_function",
-            ],
-            "java": [
-                "method_declaration",
-                "class_declaration",
-                "interface_declaration",
-            ],
-            "cpp": ["function_definition", "class_specifier", "struct_specifier"],
-            "c": ["function_definition", "struct_specifier"],
-            "go": ["function_declaration", "method_declaration", "type_declaration"],
-            "rust": [
-                "function_item",
-                "impl_item",
-                "struct_item",
-                "trait_item",
-                "enum_item",
-            ],
-        }
+        # Encode once: tree-sitter offsets are UTF-8 byte offsets, so
+        # slicing the str would drift on any multibyte character. The
+        # memoryview keeps per-chunk slices copy-free until decode.
+        code_bytes = bytes(code, "utf8")
+        view = memoryview(code_bytes)
 
-        target_types = set(
-            targets.get(lang, ["function_definition", "class_definition"])
-        )
+        # Parse once
+        tree = parser.parse(code_bytes)
 
         covered_ranges = []
 
-        def traverse(node: Node):
-            """Recursively traverse the tree to find target nodes."""
-            # Special handling for export statements in JS/TS
-            # export_statement wraps the actual declaration, so unwrap it
-            if node.type == "export_statement" and lang in ["javascript", "typescript"]:
-                # Look for the declaration inside the export
-                for child in node.children:
-                    if child.type in [
-                        "function_declaration",
-                        "class_declaration",
-                        "lexical_declaration",
-                        "variable_declaration",
-                    ]:
-                        # Process the actual declaration with the export's full range
-                        start_byte, end_byte = node.start_byte, node.end_byte
-                        chunk_text = code[start_byte:end_byte]
-
-                        if len(chunk_text.strip()) < 20:
-                            continue
-
-                        # Extract name from the child declaration
-                        function_name = extract_function_name(child, code, lang)
-                        docstring = extract_docstring(child, code, lang)
-
-                        start_line = node.start_point[0] + 1
-                        end_line = node.end_point[0] + 1
-
-                        chunks.append(
-                            {
-                                "text": chunk_text,
-                                "metadata": {
-                                    "file": file_path,
-                                    "start_line": start_line,
-                                    "end_line": end_line,
-                                    "type": child.type,
-                                    "level": "code_chunk",
-                                    "function_name": function_name,
-                                    "docstring": docstring,
-                                    "location": {
-                                        "file": file_path,
-                                        "start_line": start_line,
-                                        "end_line": end_line,
-                                    },
-                                },
-                            }
-                        )
-                        covered_ranges.append((start_line, end_line))
-                        return  # Don't traverse further
-
-                # If no declaration found, continue traversing
-                for child in node.children:
-                    traverse(child)
-                return
-
-            if node.type in target_types:
-                start_byte, end_byte = node.start_byte, node.end_byte
-                chunk_text = code[start_byte:end_byte]
-
-                # Skip very small chunks (e.g. empty declarations)
-                if len(chunk_text.strip()) < 20:
-                    for child in node.children:
-                        traverse(child)
-                    return
-
-                function_name = extract_function_name(node, code, lang)
-                docstring = extract_docstring(node, code, lang)
-
-                start_line = node.start_point[0] + 1
-                end_line = node.end_point[0] + 1
-
-                chunks.append(
-                    {
-                        "text": chunk_text,
-                        "metadata": {
-                            "file": file_path,
-                            "start_line": start_line,
-                            "end_line": end_line,
-                            "type": node.type,
-                            "level": "code_chunk",
-                            "function_name": function_name,
-                            "docstring": docstring,
-                            "location": {
-                                "file": file_path,
-                                "start_line": start_line,
-                                "end_line": end_line,
-                            },
-                        },
-                    }
-                )
-                covered_ranges.append((start_line, end_line))
-                # Do not traverse children of a target node to avoid nested chunks
-                # (unless it's a class, where we might want methods - but current logic
-                # handles methods separately if they are targets)
-                if "class" not in node.type:
-                    return
+        # The compiled query walks the tree in C and hands back only the
+        # matching nodes, replacing the Python-level recursion over every
+        # AST node
+        query = ParserManager.get_query(lang)
+        nodes = _query_captures(query, tree.root_node).get("node", [])
+        nodes.sort(key=lambda n: (n.start_byte, -n.end_byte))
+
+        # Stack of accepted enclosing chunks as (end_byte, descend) pairs;
+        # descend marks class-like nodes whose methods should chunk too.
+        # A captured node nested inside an accepted non-class chunk is
+        # dropped, matching the old traversal's early return.
+        accepted = []
+
+        for node in nodes:
+            start_byte, end_byte = node.start_byte, node.end_byte
+            while accepted and start_byte >= accepted[-1][0]:
+                accepted.pop()
+            if accepted and not accepted[-1][1]:
+                continue
 
-            for child in node.children:
-                traverse(child)
+            if node.type == "export_statement":
+                # export_statement wraps the actual declaration, so unwrap
+                # it; the export's full range becomes the chunk
+                inner = next(
+                    (c for c in node.children if c.type in _EXPORTED_DECLARATIONS),
+                    None,
+                )
+                if inner is None:
+                    continue
+                name_node, chunk_type, descend = inner, inner.type, False
+            else:
+                name_node, chunk_type = node, node.type
+                descend = "class" in node.type
+
+            chunk_text = str(view[start_byte:end_byte], "utf-8", "ignore")
+
+            # Skip very small chunks (e.g. empty declarations); children
+            # were captured independently and will still be considered
+            if len(chunk_text.strip()) < 20:
+                continue
 
-        traverse(tree.root_node)
+            function_name = extract_function_name(name_node, view, lang)
+            docstring = extract_docstring(name_node, view, lang)
+
+            start_line = node.start_point[0] + 1
+            end_line = node.end_point[0] + 1
+
+            yield {
+                "text": chunk_text,
+                "metadata": {
+                    "file": file_path,
+                    "start_line": start_line,
+                    "end_line": end_line,
+                    "type": chunk_type,
+                    "level": "code_chunk",
+                    "function_name": function_name,
+                    "docstring": docstring,
+                    **_text_counts(chunk_text),
+                },
+            }
+            covered_ranges.append((start_line, end_line))
+            accepted.append((end_byte, descend))
 
         # Fill gaps with line windows
         lines = code.split("\n")
@@ -398,27 +477,18 @@ def extract_chunks(code: str, lang: str, file_path: str) -> List[Dict]:
                 chunk_text = "\n".join(lines[i - 1 : win_end])
 
                 if chunk_text.strip():
-                    chunks.append(
-                        {
-                            "text": chunk_text,
-                            "metadata": {
-                                "file": file_path,
-                                "start_line": i,
-                                "end_line": win_end,
-                                "type": "gap_window",
-                                "level": "code_chunk",
-                                "function_name": "top-level",
-                                "location": {
-                                    "file": file_path,
-                                    "start_line": i,
-                                    "end_line": win_end,
-                                },
-                            },
-                        }
-                    )
-
-        return chunks
+                    yield {
+                        "text": chunk_text,
+                        "metadata": {
+                            "file": file_path,
+                            "start_line": i,
+                            "end_line": win_end,
+                            "type": "gap_window",
+                            "level": "code_chunk",
+                            "function_name": "top-level",
+                            **_text_counts(chunk_text),
+                        },
+                    }
 
     except Exception:
         print(f"Parse error {file_path}: {traceback.format_exc()}", file=sys.stderr)
-        return []
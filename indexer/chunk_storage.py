@@ -3,12 +3,32 @@ Chunk storage utilities for metadata-only RAG.
 """
 
 import hashlib
-import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from pathlib import Path
-from typing import Dict
+from typing import Dict, Iterable, Optional
+
+import orjson
 
 from config.config import SUPPORTED_LANGS
 
+# Shared executor for overlapping chunk file reads; threads release the GIL
+# during file I/O so concurrent reads hide per-file disk latency.
+_chunk_read_executor = ThreadPoolExecutor(max_workers=8)
+
+
+@lru_cache(maxsize=256)
+def _path_prefix_hash(file_path: str):
+    """Hash state for a file path prefix, shared across its chunks.
+
+    A file yields one chunk per function, so hashing the (often long)
+    path once and cloning the state per chunk beats rehashing it.
+    """
+    hasher = hashlib.sha256()
+    hasher.update(f"{file_path}:".encode())
+    return hasher
+
 
 def generate_chunk_id(file_path: str, start_line: int, end_line: int) -> str:
     """Generate a unique chunk ID based on file path and line numbers.
@@ -21,8 +41,9 @@ def generate_chunk_id(file_path: str, start_line: int, end_line: int) -> str:
     Returns:
         Unique chunk identifier string.
     """
-    content = f"{file_path}:{start_line}:{end_line}"
-    return hashlib.sha256(content.encode()).hexdigest()[:16]
+    hasher = _path_prefix_hash(file_path).copy()
+    hasher.update(f"{start_line}:{end_line}".encode())
+    return hasher.hexdigest()[:16]
 
 
 def save_full_chunk(
@@ -44,42 +65,108 @@ def save_full_chunk(
         f.write(full_code)
 
 
-def load_full_chunk(chunk_id: str, index_prefix: str) -> str:
+def _read_chunk_file(chunk_file: Path, max_bytes: Optional[int]) -> Optional[str]:
+    """Read and sanitize a chunk file, returning None when it doesn't exist."""
+    try:
+        with open(chunk_file, "rb") as f:
+            raw = f.read(-1 if max_bytes is None else max_bytes)
+    except OSError:
+        return None
+    content = raw.decode("utf-8", errors="ignore")
+    # Strip non-ASCII characters to prevent encoding issues
+    return ''.join(char for char in content if ord(char) < 128)
+
+
+def load_full_chunk(
+    chunk_id: str,
+    index_prefix: str,
+    max_bytes: Optional[int] = None,
+    full_code_path: Optional[str] = None,
+) -> str:
     """Load the full chunk code from disk.
 
     Args:
         chunk_id: Unique identifier for the chunk.
         index_prefix: Directory prefix where the index is stored.
+        max_bytes: If set, read at most this many bytes from the file so
+            callers that truncate anyway avoid decoding the whole chunk.
+        full_code_path: Relative path stored in the chunk metadata at index
+            time; when given the file is opened directly instead of probing
+            every supported extension.
 
     Returns:
-        The complete source code of the chunk with non-ASCII characters stripped.
+        The chunk source code with non-ASCII characters stripped.
     """
+    if full_code_path:
+        content = _read_chunk_file(Path(index_prefix) / full_code_path, max_bytes)
+        if content is not None:
+            return content
+
     full_chunks_dir = Path(index_prefix) / "full_chunks"
 
-    # Try all supported language extensions plus .txt as fallback
+    # Fall back to trying all supported language extensions plus .txt/.md
+    # (older indexes don't carry full_code_path in their metadata)
     extensions_to_try = list(SUPPORTED_LANGS.keys()) + [".txt", ".md"]
 
     for extension in extensions_to_try:
-        chunk_file = full_chunks_dir / f"{chunk_id}{extension}"
-        if chunk_file.exists():
-            with open(chunk_file, "r", encoding="utf-8") as f:
-                content = f.read()
-                # Strip non-ASCII characters to prevent encoding issues
-                return ''.join(char for char in content if ord(char) < 128)
+        content = _read_chunk_file(full_chunks_dir / f"{chunk_id}{extension}", max_bytes)
+        if content is not None:
+            return content
 
     return f"[Chunk {chunk_id} not found]"
 
 
-def save_metadata_json(metadata: Dict, output_prefix: str):
+def load_full_chunks(
+    chunk_ids: Iterable[str],
+    index_prefix: str,
+    max_bytes: Optional[int] = None,
+    paths: Optional[Dict[str, Optional[str]]] = None,
+) -> Dict[str, str]:
+    """Load several full chunks from disk concurrently.
+
+    Args:
+        chunk_ids: Chunk identifiers to load (falsy entries are skipped).
+        index_prefix: Directory prefix where the index is stored.
+        max_bytes: If set, read at most this many bytes per chunk file.
+        paths: Optional mapping of chunk ID to its stored full_code_path,
+            which skips extension probing for those chunks.
+
+    Returns:
+        Mapping of chunk ID to its full source code.
+    """
+    unique_ids = [chunk_id for chunk_id in dict.fromkeys(chunk_ids) if chunk_id]
+    paths = paths or {}
+    contents = _chunk_read_executor.map(
+        lambda chunk_id: load_full_chunk(
+            chunk_id, index_prefix, max_bytes, paths.get(chunk_id)
+        ),
+        unique_ids,
+    )
+    return dict(zip(unique_ids, contents))
+
+
+def save_metadata_json(metadata: Dict, output_prefix: str, *, pretty: bool = False):
     """Save metadata mapping to JSON file.
 
     Args:
         metadata: Dictionary containing chunk metadata.
         output_prefix: Directory prefix for output files.
+        pretty: Indent the output for human inspection; the default is
+            compact since the file is machine-read.
     """
     metadata_file = Path(output_prefix) / "chunk_metadata.json"
-    with open(metadata_file, "w", encoding="utf-8") as f:
-        json.dump(metadata, f, indent=2)
+    # orjson emits UTF-8 bytes from C; writing them in binary mode skips
+    # the stdlib encoder's per-key Python callbacks and the text-mode
+    # encode pass.
+    # write_bytes pushes the whole buffer through one write() call rather
+    # than chunking a multi-MB payload through a small file buffer.
+    # Write to a temp file and rename so a concurrent reader never sees a
+    # partially written file
+    tmp_file = Path(output_prefix) / ".chunk_metadata.json.tmp"
+    tmp_file.write_bytes(
+        orjson.dumps(metadata, option=orjson.OPT_INDENT_2 if pretty else 0)
+    )
+    os.replace(tmp_file, metadata_file)
 
 
 def load_metadata_json(index_prefix: str) -> Dict:
@@ -93,8 +180,10 @@ def load_metadata_json(index_prefix: str) -> Dict:
     """
     metadata_file = Path(index_prefix) / "chunk_metadata.json"
 
-    if not metadata_file.exists():
+    # orjson parses in C; for metadata maps covering tens of thousands of
+    # chunks this is several times faster than stdlib json. EAFP: one open
+    # syscall instead of a stat followed by an open
+    try:
+        return orjson.loads(metadata_file.read_bytes())
+    except FileNotFoundError:
         return {}
-
-    with open(metadata_file, "r", encoding="utf-8") as f:
-        return json.load(f)
@@ -5,21 +5,41 @@ File collection and processing logic.
 import hashlib
 import os
 import sys
-import threading
 import traceback
 from collections import defaultdict
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from concurrent.futures import (
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+    as_completed,
+)
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Dict, Iterable, List, Optional
 
 from tqdm import tqdm
 
 from line_profiler import profile
-from .ast_parser import extract_chunks
-from config.config import IGNORED_DIRS, IGNORED_FILES, SUPPORTED_LANGS
-from .summarizer import summarize_file, summarize_folder
+from .ast_parser import _text_counts, extract_chunks
+from config.config import (
+    FILE_WORKERS,
+    FOLDER_WORKERS,
+    IGNORED_DIRS,
+    IGNORED_FILES,
+    SUPPORTED_LANGS,
+)
+from .summarizer import (
+    SUMMARY_BATCH_SIZE,
+    summarize_files_batch,
+    summarize_folders_batch,
+)
 from .chunk_storage import generate_chunk_id, save_full_chunk
 
+# Suffix-only view of SUPPORTED_LANGS for the walker's hot loop, plus the
+# longest suffix length so rfind only scans the tail of each name.
+# Membership stays case-sensitive: process_single_file looks the suffix
+# up in SUPPORTED_LANGS verbatim
+_SUPPORTED_SUFFIXES = frozenset(SUPPORTED_LANGS)
+_MAX_EXT_LEN = max(map(len, _SUPPORTED_SUFFIXES))
+
 
 def hash_file(file_path: Path) -> str:
     """Calculate SHA-256 hash of a file.
@@ -49,21 +69,36 @@ def collect_files_to_process(repo_path: str) -> List[Path]:
     """
     files_to_process = []
 
-    for root, _, files in os.walk(repo_path):
-        # Skip ignored directories (check if any path component matches)
-        path_parts = Path(root).parts
-        if any(part in IGNORED_DIRS for part in path_parts):
-            continue
-
-        for file in files:
-            # Skip ignored files
-            if file in IGNORED_FILES:
-                continue
-
-            ext = Path(file).suffix
-            if ext in SUPPORTED_LANGS:
-                files_to_process.append(Path(root) / file)
-
+    # os.scandir hands back DirEntry objects whose type info is cached from
+    # the directory read, so the walk never re-stats files, prunes ignored
+    # directories before descending, and only allocates a Path for files
+    # that are actually collected
+    def _scan(directory: str) -> None:
+        try:
+            entries = os.scandir(directory)
+        except OSError:
+            return
+        with entries:
+            for entry in entries:
+                name = entry.name
+                if entry.is_dir(follow_symlinks=False):
+                    if name not in IGNORED_DIRS:
+                        _scan(entry.path)
+                else:
+                    # Same semantics as Path(name).suffix without the
+                    # Path allocation; the bounded rfind never scans past
+                    # the longest supported suffix. The suffix test comes
+                    # first - it rejects most files, so the IGNORED_FILES
+                    # lookup only runs for candidates
+                    dot = name.rfind(".", -_MAX_EXT_LEN - 1)
+                    if (
+                        dot > 0
+                        and name[dot:] in _SUPPORTED_SUFFIXES
+                        and name not in IGNORED_FILES
+                    ):
+                        files_to_process.append(Path(entry.path))
+
+    _scan(str(repo_path))
     return files_to_process
 
 
@@ -79,7 +114,9 @@ def process_single_file(
         output_prefix: Directory prefix for output files (for saving full chunks).
 
     Returns:
-        Tuple containing (chunks, file_summary, summary_chunk, error).
+        Tuple containing (chunks, summary_candidate, error) where
+        summary_candidate is a (rel_path, code) pair when the file is
+        substantial enough to summarize.
     """
     try:
         with open(file_path, "r", encoding="utf-8", errors="ignore") as f:
@@ -88,22 +125,28 @@ def process_single_file(
         rel_path = str(file_path.relative_to(repo_path))
         lang = SUPPORTED_LANGS[file_path.suffix]
 
-        # Extract chunks based on file type
-        file_chunks = _extract_file_chunks(code, lang, rel_path)
+        # Extract and process chunks as the parser yields them; IDs and
+        # saved content are handled per chunk without buffering the whole
+        # file's chunk list twice
+        file_chunks = _process_chunks(
+            _extract_file_chunks(code, lang, rel_path),
+            code,
+            rel_path,
+            file_path,
+            output_prefix,
+        )
 
-        # Process each chunk: generate IDs and save content
-        _process_chunks(file_chunks, code, rel_path, file_path, output_prefix)
+        # Summaries are generated later in batched LLM calls; only flag
+        # substantial files as candidates here
+        summary_candidate = (rel_path, code) if len(code) > 100 else None
 
-        # Generate file summary if file is substantial
-        file_summary, summary_chunk = _generate_file_summary(code, rel_path)
-
-        return file_chunks, file_summary, summary_chunk, None
+        return file_chunks, summary_candidate, None
 
     except Exception:
-        return [], None, None, f"Error processing {file_path}: {traceback.format_exc()}"
+        return [], None, f"Error processing {file_path}: {traceback.format_exc()}"
 
 
-def _extract_file_chunks(code: str, lang: str, rel_path: str) -> List[Dict]:
+def _extract_file_chunks(code: str, lang: str, rel_path: str) -> Iterable[Dict]:
     """Extract chunks from file based on language type."""
     if lang == "markdown":
         return [
@@ -113,23 +156,24 @@ def _extract_file_chunks(code: str, lang: str, rel_path: str) -> List[Dict]:
                     "level": "document",
                     "file": rel_path,
                     "type": "markdown",
-                    "location": {"file": rel_path},
+                    **_text_counts(code),
                 },
             }
         ]
     else:
-        # Extract code chunks for programming languages
+        # Extract code chunks for programming languages (lazily yielded)
         return extract_chunks(code, lang, rel_path)
 
 
 def _process_chunks(
-    file_chunks: List[Dict],
+    file_chunks: Iterable[Dict],
     code: str,
     rel_path: str,
     file_path: Path,
     output_prefix: Optional[str],
-) -> None:
-    """Process chunks to generate IDs and save content."""
+) -> List[Dict]:
+    """Process chunks to generate IDs and save content as they arrive."""
+    processed = []
     for chunk in file_chunks:
         metadata = chunk["metadata"]
         level = metadata.get("level")
@@ -140,6 +184,8 @@ def _process_chunks(
             _process_document_chunk(
                 chunk, metadata, code, rel_path, file_path, output_prefix
             )
+        processed.append(chunk)
+    return processed
 
 
 def _process_code_chunk(
@@ -168,16 +214,14 @@ def _process_code_chunk(
         # Build searchable text from metadata ONLY
         # Embedding models work best with natural language descriptions, not raw code
         # The full code is saved separately and loaded during the refinement phase
-        metadata_text_parts = []
-        if function_name != "unknown":
-            metadata_text_parts.append(f"Function: {function_name}")
-        metadata_text_parts.append(f"File: {rel_path}")
-        metadata_text_parts.append(f"Lines: {start_line}-{end_line}")
-        metadata_text_parts.append(f"Type: {metadata.get('type', 'code')}")
-        if docstring:
-            metadata_text_parts.append(f"Documentation: {docstring}")
-
-        chunk["text"] = "\n".join(metadata_text_parts)
+        # Single f-string instead of list appends + join; run once per
+        # chunk, this adds up across a large corpus
+        chunk["text"] = (
+            (f"Function: {function_name}\n" if function_name != "unknown" else "")
+            + f"File: {rel_path}\nLines: {start_line}-{end_line}"
+            + f"\nType: {metadata.get('type', 'code')}"
+            + (f"\nDocumentation: {docstring}" if docstring else "")
+        )
 
 
 def _process_document_chunk(
@@ -203,24 +247,16 @@ def _process_document_chunk(
     chunk["text"] = f"DOCUMENT: {rel_path}\n\n{code}"
 
 
-def _generate_file_summary(code: str, rel_path: str) -> tuple:
-    """Generate file summary if file is substantial enough."""
-    if len(code) <= 100:
-        return None, None
-
-    summary = summarize_file(code, rel_path)
-    file_summary = (rel_path, summary)
-    summary_chunk = {
+def _build_summary_chunk(rel_path: str, summary: str) -> Dict:
+    """Build the searchable chunk for a file summary."""
+    return {
         "text": f"FILE: {rel_path}\n{summary}",
         "metadata": {
             "file": rel_path,
             "level": "file_summary",
-            "location": {"file": rel_path},
         },
     }
 
-    return file_summary, summary_chunk
-
 
 @profile
 def process_files(
@@ -241,38 +277,71 @@ def process_files(
         Tuple containing (chunks, file_summaries) where chunks is a list of all extracted chunks
         and file_summaries is a dict mapping file paths to their summaries.
     """
+    # All collection callbacks run on the main thread inside the
+    # as_completed loops, so no locks are needed around these
     chunks = []
     file_summaries = {}
     errors = []
+    summary_candidates = []
+
+    # Files with identical (truncated) content share one summarization call;
+    # the hash groups them and the result is broadcast to every member
+    summary_groups: Dict[bytes, List[str]] = {}
+
+    def _candidate_hash(code: str) -> bytes:
+        # Hash exactly the prefix the summary prompts send (code[:3500]
+        # in summarize_files_batch); grouping on a shorter prefix could
+        # merge files whose LLM-visible content differs
+        return hashlib.blake2b(code[:3500].encode(), digest_size=16).digest()
+
+    # Parsing is CPU-bound tree-sitter work, so it runs in a process pool
+    # that sidesteps the GIL; summaries stay on threads since they block on
+    # LLM HTTP calls. Batches are dispatched while parsing is still in
+    # flight, so the round-trips overlap the CPU work. Each worker process
+    # builds its own parsers and encodings lazily on first use.
+    with ProcessPoolExecutor(max_workers=os.cpu_count()) as parse_pool, \
+            ThreadPoolExecutor(max_workers=FILE_WORKERS) as executor:
+        summary_futures = []
+
+        def submit_summary_batch():
+            """Dispatch the pending candidates as one batched LLM call."""
+            batch = summary_candidates[:SUMMARY_BATCH_SIZE]
+            del summary_candidates[:SUMMARY_BATCH_SIZE]
+            summary_futures.append(
+                executor.submit(lambda b: (b, summarize_files_batch(b)), batch)
+            )
 
-    # Thread-safe data structures
-    chunks_lock = threading.Lock()
-    summaries_lock = threading.Lock()
-    errors_lock = threading.Lock()
-
-    def collect_results(future):
-        """Collect results from completed futures."""
-        file_chunks, file_summary, summary_chunk, error = future.result()
+        def collect_results(future):
+            """Collect results from completed parse futures."""
+            file_chunks, summary_candidate, error = future.result()
 
-        if file_chunks:
-            with chunks_lock:
+            if file_chunks:
                 chunks.extend(file_chunks)
 
-        if file_summary:
-            rel_path, summary = file_summary
-            with summaries_lock:
-                file_summaries[rel_path] = summary
-            with chunks_lock:
-                chunks.append(summary_chunk)
-
-        if error:
-            with errors_lock:
+            if summary_candidate:
+                group = summary_groups.setdefault(
+                    _candidate_hash(summary_candidate[1]), []
+                )
+                group.append(summary_candidate[0])
+                # Only the first file with this content goes to the LLM
+                if len(group) == 1:
+                    summary_candidates.append(summary_candidate)
+                    if len(summary_candidates) >= SUMMARY_BATCH_SIZE:
+                        submit_summary_batch()
+
+            if error:
                 errors.append(error)
 
-    # Process files with 8 threads
-    with ThreadPoolExecutor(max_workers=8) as executor:
+        def collect_summary_results(future):
+            """Collect results from completed summary-batch futures."""
+            batch, summaries = future.result()
+            for (rel_path, code), summary in zip(batch, summaries):
+                for member in summary_groups.get(_candidate_hash(code), [rel_path]):
+                    file_summaries[member] = summary
+                    chunks.append(_build_summary_chunk(member, summary))
+
         futures = [
-            executor.submit(process_single_file, file_path, repo_path, output_prefix)
+            parse_pool.submit(process_single_file, file_path, repo_path, output_prefix)
             for file_path in files_to_process
         ]
 
@@ -286,6 +355,21 @@ def process_files(
             ):
                 collect_results(future)
 
+        # Flush any remaining candidates that didn't fill a whole batch
+        while summary_candidates:
+            submit_summary_batch()
+
+        if quiet:
+            for future in as_completed(summary_futures):
+                collect_summary_results(future)
+        else:
+            for future in tqdm(
+                as_completed(summary_futures),
+                total=len(summary_futures),
+                desc="Summarizing files",
+            ):
+                collect_summary_results(future)
+
     # Print any errors that occurred
     for error in errors:
         print(error, file=sys.stderr)
@@ -310,7 +394,8 @@ def generate_folder_summaries(
     folder_groups = defaultdict(list)
 
     for path, summary in file_summaries.items():
-        folder = str(Path(path).parent)
+        # String split beats Path construction in this per-file loop
+        folder = path.rsplit("/", 1)[0] if "/" in path else "."
         folder_groups[folder].append((path, summary))
 
     # Prepare folders to process (skip root)
@@ -321,34 +406,35 @@ def generate_folder_summaries(
     if not folders_to_process:
         return chunks
 
-    # Thread-safe chunks list
-    chunks_lock = threading.Lock()
-
-    def process_folder(folder_data):
-        """Process a single folder summary."""
-        folder, files = folder_data
-        folder_sum = summarize_folder(files)
-        folder_chunk = {
-            "text": f"FOLDER: {folder}\n{folder_sum}",
-            "metadata": {
-                "folder": folder,
-                "level": "folder_summary",
-                "location": {"folder": folder},
-            },
-        }
-        return folder_chunk
+    def process_folder_batch(folder_batch):
+        """Summarize a batch of folders with a single LLM call."""
+        purposes = summarize_folders_batch(folder_batch)
+        return [
+            {
+                "text": f"FOLDER: {folder}\n{folder_sum}",
+                "metadata": {
+                    "folder": folder,
+                    "level": "folder_summary",
+                },
+            }
+            for (folder, _), folder_sum in zip(folder_batch, purposes)
+        ]
 
     def collect_folder_result(future):
-        """Collect results from completed folder futures."""
-        folder_chunk = future.result()
-        with chunks_lock:
-            chunks.append(folder_chunk)
+        """Collect results from completed folder-batch futures."""
+        chunks.extend(future.result())
+
+    # Batch folders so one LLM call covers several of them
+    folder_batches = [
+        folders_to_process[i : i + SUMMARY_BATCH_SIZE]
+        for i in range(0, len(folders_to_process), SUMMARY_BATCH_SIZE)
+    ]
 
-    # Process folders with 8 threads
-    with ThreadPoolExecutor(max_workers=8) as executor:
+    # The workers block on LLM HTTP calls, so the pool is sized for I/O
+    with ThreadPoolExecutor(max_workers=FOLDER_WORKERS) as executor:
         futures = [
-            executor.submit(process_folder, folder_data)
-            for folder_data in folders_to_process
+            executor.submit(process_folder_batch, folder_batch)
+            for folder_batch in folder_batches
         ]
 
         # Use tqdm to track progress (unless quiet mode)
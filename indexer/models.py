@@ -20,6 +20,36 @@ class FolderSummary(BaseModel):
     purpose: str
 
 
+class FileSummaryItem(BaseModel):
+    """Summary of one file within a batched summarization response."""
+
+    model_config = ConfigDict(extra="forbid")
+    index: int
+    summary: str
+
+
+class FileSummariesBatch(BaseModel):
+    """Batched file summaries keyed by prompt index."""
+
+    model_config = ConfigDict(extra="forbid")
+    summaries: list[FileSummaryItem]
+
+
+class FolderSummaryItem(BaseModel):
+    """Purpose of one folder within a batched summarization response."""
+
+    model_config = ConfigDict(extra="forbid")
+    index: int
+    purpose: str
+
+
+class FolderSummariesBatch(BaseModel):
+    """Batched folder purposes keyed by prompt index."""
+
+    model_config = ConfigDict(extra="forbid")
+    summaries: list[FolderSummaryItem]
+
+
 class FunctionMetadata(BaseModel):
     """Metadata for a single function chunk in metadata-only RAG."""
 
@@ -2,9 +2,12 @@
 File and folder summarization using LLM.
 """
 
+import os
 import traceback
 from pathlib import Path
-from typing import List
+from typing import List, Tuple
+
+import orjson
 
 from config.config import (
     SUMMARIZATION_MODEL,
@@ -12,7 +15,23 @@ from config.config import (
     chat_completion,
     extract_chat_content,
 )
-from .models import FileSummary, FolderSummary
+from .models import (
+    FileSummariesBatch,
+    FileSummary,
+    FolderSummariesBatch,
+    FolderSummary,
+)
+
+# Number of files/folders fused into one summarization request; round-trip
+# overhead dominates these tiny prompts, so batching amortizes it
+SUMMARY_BATCH_SIZE = 8
+
+# The schemas never change, so build them once instead of paying pydantic's
+# schema generation on every summarization call
+_FILE_SUMMARY_SCHEMA = FileSummary.model_json_schema()
+_FILE_SUMMARIES_BATCH_SCHEMA = FileSummariesBatch.model_json_schema()
+_FOLDER_SUMMARY_SCHEMA = FolderSummary.model_json_schema()
+_FOLDER_SUMMARIES_BATCH_SCHEMA = FolderSummariesBatch.model_json_schema()
 
 
 def summarize_file(code: str, file_path: str) -> str:
@@ -26,7 +45,7 @@ def summarize_file(code: str, file_path: str) -> str:
         One to two sentence summary of the file's purpose and key components.
     """
     try:
-        prompt = f"""Summarize this {Path(file_path).suffix} file in 1-2 sentences based on the code provided.
+        prompt = f"""Summarize this {os.path.splitext(file_path)[1]} file in 1-2 sentences based on the code provided.
 
 Focus on: main purpose, key functions/classes, and specific technologies or patterns you can identify.
 Be factual - only describe what you actually see in the code.
@@ -36,7 +55,7 @@ Be factual - only describe what you actually see in the code.
 Summary:"""
 
         response_format = build_structured_output_format(
-            FileSummary.model_json_schema(), schema_name="file_summary"
+            _FILE_SUMMARY_SCHEMA, schema_name="file_summary"
         )
         resp = chat_completion(
             messages=[{"role": "user", "content": prompt}],
@@ -48,8 +67,9 @@ Summary:"""
         message_content = extract_chat_content(resp)
         if message_content:
             try:
-                summary_data = FileSummary.model_validate_json(message_content)
-                return summary_data.summary
+                # Structured output already matches the schema; skip the
+                # pydantic round-trip and read the field directly
+                return orjson.loads(message_content)["summary"]
             except Exception:
                 # If JSON parsing fails, use the raw response as summary
                 # Remove common prefixes that might indicate non-JSON response
@@ -66,6 +86,60 @@ Summary:"""
         )
 
 
+def summarize_files_batch(items: List[Tuple[str, str]]) -> List[str]:
+    """Generate summaries for several files with a single LLM call.
+
+    Args:
+        items: List of (file_path, code) pairs to summarize together.
+
+    Returns:
+        Summaries aligned with the input order.
+    """
+    if not items:
+        return []
+    if len(items) == 1:
+        file_path, code = items[0]
+        return [summarize_file(code, file_path)]
+
+    try:
+        sections = "\n\n".join(
+            f"[File {i}] {file_path}\n{code[:3500]}"
+            for i, (file_path, code) in enumerate(items)
+        )
+
+        prompt = f"""Summarize each of the following {len(items)} files in 1-2 sentences based on the code provided.
+
+Focus on: main purpose, key functions/classes, and specific technologies or patterns you can identify.
+Be factual - only describe what you actually see in the code.
+
+{sections}
+
+Return one summary per file, keyed by its [File N] index."""
+
+        response_format = build_structured_output_format(
+            _FILE_SUMMARIES_BATCH_SCHEMA, schema_name="file_summaries_batch"
+        )
+        resp = chat_completion(
+            messages=[{"role": "user", "content": prompt}],
+            model=SUMMARIZATION_MODEL,
+            response_format=response_format,
+            options={"temperature": 0.3},
+        )
+
+        message_content = extract_chat_content(resp)
+        parsed = orjson.loads(message_content)
+        by_index = {int(item["index"]): item["summary"] for item in parsed["summaries"]}
+        # Fall back to single-file summarization for any index the model skipped
+        return [
+            by_index.get(i) or summarize_file(code, file_path)
+            for i, (file_path, code) in enumerate(items)
+        ]
+
+    except Exception:
+        # Batch call failed entirely; summarize files one at a time
+        return [summarize_file(code, file_path) for file_path, code in items]
+
+
 def summarize_folder(file_summaries: List[tuple]) -> str:
     """Aggregate file summaries into folder overview.
 
@@ -92,7 +166,7 @@ def summarize_folder(file_summaries: List[tuple]) -> str:
 Provide the folder purpose."""
 
         response_format = build_structured_output_format(
-            FolderSummary.model_json_schema(), schema_name="folder_summary"
+            _FOLDER_SUMMARY_SCHEMA, schema_name="folder_summary"
         )
         resp = chat_completion(
             messages=[{"role": "user", "content": prompt}],
@@ -104,8 +178,7 @@ Provide the folder purpose."""
         message_content = extract_chat_content(resp)
         if message_content:
             try:
-                folder_data = FolderSummary.model_validate_json(message_content)
-                return folder_data.purpose
+                return orjson.loads(message_content)["purpose"]
             except Exception:
                 # If JSON parsing fails, use the raw response as summary
                 # Remove common prefixes that might indicate non-JSON response
@@ -117,4 +190,58 @@ Provide the folder purpose."""
             return "Multiple code files"
 
     except Exception:
-        return "Multiple code files"
\ No newline at end of file
+        return "Multiple code files"
+
+
+def summarize_folders_batch(folders: List[Tuple[str, List[tuple]]]) -> List[str]:
+    """Generate purposes for several folders with a single LLM call.
+
+    Args:
+        folders: List of (folder, file_summaries) pairs, where file_summaries
+            holds (file_path, summary) tuples for the folder.
+
+    Returns:
+        Folder purposes aligned with the input order.
+    """
+    if not folders:
+        return []
+    if len(folders) == 1:
+        return [summarize_folder(folders[0][1])]
+
+    try:
+        sections = []
+        for i, (folder, file_summaries) in enumerate(folders):
+            formatted_list = "\n".join(
+                f"- {Path(p).name}: {s}" for p, s in file_summaries[:8]
+            )
+            sections.append(f"[Folder {i}] {folder}\n{formatted_list}")
+        combined_sections = "\n\n".join(sections)
+
+        prompt = f"""Summarize each of the following {len(folders)} folders from their file overviews (1 sentence each):
+
+{combined_sections}
+
+Return one purpose per folder, keyed by its [Folder N] index."""
+
+        response_format = build_structured_output_format(
+            _FOLDER_SUMMARIES_BATCH_SCHEMA, schema_name="folder_summaries_batch"
+        )
+        resp = chat_completion(
+            messages=[{"role": "user", "content": prompt}],
+            model=SUMMARIZATION_MODEL,
+            response_format=response_format,
+            options={"temperature": 0.3},
+        )
+
+        message_content = extract_chat_content(resp)
+        parsed = orjson.loads(message_content)
+        by_index = {int(item["index"]): item["purpose"] for item in parsed["summaries"]}
+        # Fall back to single-folder summarization for any index the model skipped
+        return [
+            by_index.get(i) or summarize_folder(file_summaries)
+            for i, (_, file_summaries) in enumerate(folders)
+        ]
+
+    except Exception:
+        # Batch call failed entirely; summarize folders one at a time
+        return [summarize_folder(file_summaries) for _, file_summaries in folders]
\ No newline at end of file
@@ -2,14 +2,29 @@
 OpenRouter API client utilities.
 """
 
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
 from typing import Any, Dict, List, Optional, Sequence
 
-import requests
-from requests.adapters import HTTPAdapter
+import httpx
+import numpy as np
+import orjson
+
+# Embedding batches dispatched in flight at once per embed_batch call;
+# bounded so a huge index build doesn't trip provider rate limits
+_EMBED_BATCH_CONCURRENCY = 4
 
 
 class OpenRouterError(Exception):
-    """Raised when OpenRouter API requests fail."""
+    """Raised when OpenRouter API requests fail.
+
+    Attributes:
+        retry_after: Server-suggested delay in seconds for 429 responses,
+            when provided.
+    """
+
+    retry_after: Optional[float] = None
 
 
 class OpenRouterClient:
@@ -20,7 +35,7 @@ class OpenRouterClient:
         api_key: str,
         api_base: str = "https://openrouter.ai/api/v1",
         timeout_seconds: float = 60.0,
-        session: Optional[requests.Session] = None,
+        session: Optional[httpx.Client] = None,
         pool_size: int = 100,
     ) -> None:
         """Initialize the client.
@@ -29,27 +44,34 @@ class OpenRouterClient:
             api_key: Authentication key for OpenRouter.
             api_base: Base URL for the OpenRouter API.
             timeout_seconds: Request timeout in seconds.
-            session: Optional requests session for reuse.
+            session: Optional httpx client for reuse.
             pool_size: Connection pool size for concurrent requests.
         """
         self.api_key = api_key
         self.api_base = api_base.rstrip("/")
         self.timeout_seconds = timeout_seconds
+        self.pool_size = pool_size
+        self._async_client: Optional[httpx.AsyncClient] = None
 
-        if session:
-            self.session = session
-        else:
-            self.session = requests.Session()
-            adapter = HTTPAdapter(
-                pool_connections=pool_size,
-                pool_maxsize=pool_size,
-            )
-            self.session.mount("https://", adapter)
-            self.session.mount("http://", adapter)
+        # HTTP/2 multiplexes the pool threads' concurrent requests over a
+        # few warm TLS connections; auth headers are set once here rather
+        # than rebuilt per call
+        self.session = session or httpx.Client(
+            http2=True,
+            timeout=timeout_seconds,
+            limits=httpx.Limits(
+                max_connections=pool_size,
+                max_keepalive_connections=min(pool_size, 64),
+            ),
+            headers={
+                "Authorization": f"Bearer {api_key}",
+                "Content-Type": "application/json",
+            },
+        )
 
     def embed_texts(
         self, texts: Sequence[str], model: str, options: Optional[Dict[str, Any]] = None
-    ) -> List[List[float]]:
+    ) -> np.ndarray:
         """Generate embeddings for multiple texts.
 
         Args:
@@ -58,7 +80,7 @@ class OpenRouterClient:
             options: Additional OpenRouter parameters.
 
         Returns:
-            Embedding vectors corresponding to each input text.
+            Float32 array of shape (len(texts), d), one row per input text.
         """
         payload = {"model": model, "input": list(texts)}
         if options:
@@ -67,15 +89,62 @@ class OpenRouterClient:
         data = response_json.get("data")
         if not isinstance(data, list):
             raise OpenRouterError("Embeddings response missing data list.")
-        embeddings: List[List[float]] = []
+        rows = []
         for item in data:
             embedding = item.get("embedding")
             if not isinstance(embedding, list):
                 raise OpenRouterError("Embeddings response contained invalid item.")
-            embeddings.append([float(value) for value in embedding])
-        return embeddings
+            rows.append(embedding)
+        # One C-level parse of the nested lists instead of a Python float()
+        # call per scalar
+        return np.asarray(rows, dtype=np.float32)
+
+    def embed_batch(
+        self,
+        texts: Sequence[str],
+        model: str,
+        batch_size: int = 128,
+        options: Optional[Dict[str, Any]] = None,
+    ) -> np.ndarray:
+        """Generate embeddings for many texts in provider-sized slices.
+
+        One POST covers up to batch_size inputs, so embedding N chunks
+        costs ceil(N / batch_size) round-trips instead of N.
+
+        Args:
+            texts: Iterable of text inputs.
+            model: Embedding model identifier.
+            batch_size: Maximum inputs per request.
+            options: Additional OpenRouter parameters.
+
+        Returns:
+            Float32 array of shape (len(texts), d), rows in input order.
+        """
+        texts = list(texts)
+        if len(texts) <= batch_size:
+            return self.embed_texts(texts, model, options=options)
+
+        slices = [texts[i : i + batch_size] for i in range(0, len(texts), batch_size)]
+
+        def _embed_slice(idx: int) -> np.ndarray:
+            # Small jitter so concurrent batches don't hit the endpoint in
+            # lockstep
+            time.sleep(random.uniform(0, 0.05))
+            return self.embed_texts(slices[idx], model, options=options)
+
+        # Dispatch a few slices concurrently; results land back at their
+        # slice index so the output order matches the input
+        results: List[Optional[np.ndarray]] = [None] * len(slices)
+        with ThreadPoolExecutor(max_workers=_EMBED_BATCH_CONCURRENCY) as executor:
+            futures = {
+                executor.submit(_embed_slice, idx): idx for idx in range(len(slices))
+            }
+            for future, idx in futures.items():
+                results[idx] = future.result()
+
+        return np.vstack(results)
 
-    def embed_single(self, text: str, model: str) -> List[float]:
+    def embed_single(self, text: str, model: str) -> np.ndarray:
         """Generate embedding for a single text.
 
         Args:
@@ -83,7 +152,7 @@ class OpenRouterClient:
             model: Embedding model identifier.
 
         Returns:
-            Embedding vector for the provided text.
+            Float32 embedding vector for the provided text.
         """
         embeddings = self.embed_texts([text], model)
         return embeddings[0]
@@ -142,24 +211,125 @@ class OpenRouterClient:
             raise OpenRouterError("Chat completion message missing content.")
         return content
 
-    def _post(self, path: str, payload: Dict[str, Any]) -> Dict[str, Any]:
-        """Execute an authenticated POST request."""
+    async def embed_texts_async(
+        self, texts: Sequence[str], model: str, options: Optional[Dict[str, Any]] = None
+    ) -> np.ndarray:
+        """Async variant of :meth:`embed_texts` using the shared async client.
+
+        Args:
+            texts: Iterable of text inputs.
+            model: Embedding model identifier.
+            options: Additional OpenRouter parameters.
+
+        Returns:
+            Float32 array of shape (len(texts), d), one row per input text.
+        """
+        payload = {"model": model, "input": list(texts)}
+        if options:
+            payload.update(options)
+        response_json = await self._apost("/embeddings", payload)
+        data = response_json.get("data")
+        if not isinstance(data, list):
+            raise OpenRouterError("Embeddings response missing data list.")
+        rows = []
+        for item in data:
+            embedding = item.get("embedding")
+            if not isinstance(embedding, list):
+                raise OpenRouterError("Embeddings response contained invalid item.")
+            rows.append(embedding)
+        return np.asarray(rows, dtype=np.float32)
+
+    async def chat_completion_async(
+        self,
+        messages: Sequence[Dict[str, Any]],
+        model: str,
+        response_format: Optional[Dict[str, Any]] = None,
+        options: Optional[Dict[str, Any]] = None,
+    ) -> Dict[str, Any]:
+        """Async variant of :meth:`chat_completion` using the shared async client.
+
+        Args:
+            messages: Conversation messages following OpenAI schema.
+            model: Chat model identifier.
+            response_format: Optional response format schema.
+            options: Additional OpenRouter parameters.
+
+        Returns:
+            Parsed JSON response from the API.
+        """
+        payload: Dict[str, Any] = {"model": model, "messages": list(messages)}
+        if response_format is not None:
+            payload["response_format"] = response_format
+        if options:
+            payload.update(options)
+        return await self._apost("/chat/completions", payload)
+
+    async def aclose(self) -> None:
+        """Close the shared async client if it was created."""
+        if self._async_client is not None:
+            await self._async_client.aclose()
+            self._async_client = None
+
+    def _get_async_client(self) -> httpx.AsyncClient:
+        """Lazily create the shared async HTTP client.
+
+        A single HTTP/2 client multiplexes many in-flight requests over a
+        few connections, so one instance is reused for the client's
+        lifetime.
+        """
+        if self._async_client is None:
+            self._async_client = httpx.AsyncClient(
+                http2=True,
+                timeout=self.timeout_seconds,
+                limits=httpx.Limits(
+                    max_connections=self.pool_size,
+                    max_keepalive_connections=min(self.pool_size, 64),
+                ),
+                headers={
+                    "Authorization": f"Bearer {self.api_key}",
+                    "Content-Type": "application/json",
+                },
+            )
+        return self._async_client
+
+    async def _apost(self, path: str, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """Execute an authenticated POST request on the shared async client."""
         url = f"{self.api_base}{path}"
-        headers = {
-            "Authorization": f"Bearer {self.api_key}",
-            "Content-Type": "application/json",
-        }
         try:
-            response = self.session.post(
-                url, headers=headers, json=payload, timeout=self.timeout_seconds
+            response = await self._get_async_client().post(
+                url, content=orjson.dumps(payload)
             )
-        except requests.RequestException as exc:
+        except httpx.HTTPError as exc:
             raise OpenRouterError(f"OpenRouter request error: {exc}") from exc
         if response.status_code >= 400:
             raise OpenRouterError(
                 f"OpenRouter request failed ({response.status_code}): {response.text}"
             )
         try:
-            return response.json()
-        except ValueError as exc:
+            return orjson.loads(response.content)
+        except orjson.JSONDecodeError as exc:
+            raise OpenRouterError("OpenRouter response is not valid JSON.") from exc
+
+    def _post(self, path: str, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """Execute an authenticated POST request."""
+        url = f"{self.api_base}{path}"
+        try:
+            response = self.session.post(url, content=orjson.dumps(payload))
+        except httpx.HTTPError as exc:
+            raise OpenRouterError(f"OpenRouter request error: {exc}") from exc
+        if response.status_code >= 400:
+            error = OpenRouterError(
+                f"OpenRouter request failed ({response.status_code}): {response.text}"
+            )
+            if response.status_code == 429:
+                # Surface the server-suggested delay so retry loops can
+                # honor it instead of guessing
+                try:
+                    error.retry_after = float(response.headers.get("Retry-After", ""))
+                except ValueError:
+                    pass
+            raise error
+        try:
+            return orjson.loads(response.content)
+        except orjson.JSONDecodeError as exc:
             raise OpenRouterError("OpenRouter response is not valid JSON.") from exc
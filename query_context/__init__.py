@@ -2,13 +2,14 @@
 
 from .cache import check_cache, store_cache
 from .models import ChunkRanking, RankingItem, RelevanceScore
-from .query import query_context
+from .query import query_context, query_context_batch
 from .refinement import rerank_and_extract
 from .rendering import _render_context_sections
 from .reranking import _score_chunks_with_model
 
 __all__ = [
     "query_context",
+    "query_context_batch",
     "rerank_and_extract",
     "check_cache",
     "store_cache",
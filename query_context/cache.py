@@ -7,6 +7,37 @@ from typing import Dict, List, Optional
 from config.config import CACHE_TTL, cache
 
 
+def _cache_key(query: str, top_chunks: List[Dict]) -> str:
+    """Build the cache key by streaming inputs into the hash.
+
+    Feeding the query and chunk-text prefixes into the hasher one update
+    at a time produces the same digest as hashing
+    query + "|".join(prefixes) without building that temporary string.
+
+    Args:
+        query: The search query string.
+        top_chunks: Chunks whose text prefixes key the cache entry.
+
+    Returns:
+        Namespaced cache key string.
+    """
+    hasher = hashlib.sha256(query.encode())
+    first = True
+    for chunk in top_chunks:
+        if first:
+            first = False
+        else:
+            hasher.update(b"|")
+        # check_cache and store_cache see the same chunk dicts within a
+        # query, so slice+encode the prefix once and reuse it
+        prefix = chunk.get("_key_prefix_bytes")
+        if prefix is None:
+            prefix = chunk["text"][:100].encode()
+            chunk["_key_prefix_bytes"] = prefix
+        hasher.update(prefix)
+    return "context_cache:" + hasher.hexdigest()
+
+
 def check_cache(query: str, top_chunks: List[Dict]) -> Optional[str]:
     """Check semantic cache for prior refined context.
 
@@ -21,11 +52,7 @@ def check_cache(query: str, top_chunks: List[Dict]) -> Optional[str]:
     try:
         # Cache key: hash(query + chunk texts)
 
-        cache_input = query + "|".join([c["text"][:100] for c in top_chunks])
-
-        cache_key = hashlib.sha256(cache_input.encode()).hexdigest()
-
-        cached = cache.get(f"context_cache:{cache_key}")
+        cached = cache.get(_cache_key(query, top_chunks))
 
         if cached:
             print("Cache HIT", file=sys.stderr)
@@ -48,11 +75,7 @@ def store_cache(query: str, top_chunks: List[Dict], refined: str):
     """
 
     try:
-        cache_input = query + "|".join([c["text"][:100] for c in top_chunks])
-
-        cache_key = hashlib.sha256(cache_input.encode()).hexdigest()
-
-        cache.set(f"context_cache:{cache_key}", refined, CACHE_TTL)
+        cache.set(_cache_key(query, top_chunks), refined, CACHE_TTL)
 
     except Exception as e:
         print(f"Cache store failed: {e}", file=sys.stderr)
@@ -11,10 +11,14 @@ class RelevanceScore(BaseModel):
 
 
 class RankingItem(BaseModel):
-    """Single ranked item mapping a chunk id to a score."""
+    """Single ranked item mapping a chunk id to a score.
+
+    Keys are kept short on purpose: the model generates one item per
+    chunk, so key length directly scales rerank output tokens.
+    """
 
     model_config = ConfigDict(extra="forbid")
-    chunk_id: int
+    id: int
     score: float
 
 
@@ -1,42 +1,98 @@
 """Main query functionality for retrieving context from indexed repository."""
 
-import json
+import mmap
 import pickle
+from typing import Dict, List
 
 import faiss
 import numpy as np
+import orjson
 
-from config.config import EMBEDDING_MODEL, embed_single
+from config.config import EMBEDDING_MODEL, embed_texts
 from .cache import check_cache, store_cache
 from .refinement import rerank_and_extract
 
 
-def query_context(
-    query: str,
+def _strip_chunk_ascii(chunk: Dict) -> Dict:
+    """Strip non-ASCII characters from a chunk to prevent encoding issues."""
+
+    def strip_non_ascii(text):
+        if isinstance(text, str):
+            return ''.join(char for char in text if ord(char) < 128)
+        return text
+
+    if isinstance(chunk, dict):
+        if 'text' in chunk:
+            chunk['text'] = strip_non_ascii(chunk['text'])
+        if 'metadata' in chunk and isinstance(chunk['metadata'], dict):
+            for key, value in chunk['metadata'].items():
+                if isinstance(value, str):
+                    chunk['metadata'][key] = strip_non_ascii(value)
+    return chunk
+
+
+class _LazyChunkStore:
+    """Random access to chunk records without loading the whole index.
+
+    chunks.bin holds one pickled chunk per record and chunks.idx a packed
+    uint64 offset table, so a query deserializes only the top_k chunks its
+    search returns; the mmap keeps reads on the OS page cache.
+    """
+
+    def __init__(self, index_prefix: str):
+        self._offsets = np.fromfile(f"{index_prefix}/chunks.idx", dtype=np.uint64)
+        self._file = open(f"{index_prefix}/chunks.bin", "rb")
+        self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def __getitem__(self, idx: int) -> Dict:
+        start, end = int(self._offsets[idx]), int(self._offsets[idx + 1])
+        return _strip_chunk_ascii(pickle.loads(self._mm[start:end]))
+
+
+def _load_chunks(index_prefix: str):
+    """Open the lazy chunk store, falling back to a full chunks.pkl load.
+
+    Older indexes only carry chunks.pkl; those are deserialized eagerly as
+    before.
+    """
+    try:
+        return _LazyChunkStore(index_prefix)
+    except OSError:
+        with open(f"{index_prefix}/chunks.pkl", "rb") as f:
+            chunks = pickle.load(f)
+        for chunk in chunks:
+            _strip_chunk_ascii(chunk)
+        return chunks
+
+
+def query_context_batch(
+    queries: List[str],
     index_prefix: str,
     top_k: int = 20,
     output_k: int = 5,
     no_cache: bool = False,
     token_limit: int = 15000,
     quiet: bool = False,
-):
-    """Main query pipeline for retrieving context from indexed repository.
+) -> List[str]:
+    """Run several queries against the index with one search call.
+
+    The index is loaded once, the queries are embedded in a single batch,
+    and FAISS searches the whole (B, d) query matrix in one kernel pass,
+    so B related queries cost far less than B separate calls.
 
     Args:
-        query: The search query string.
+        queries: The search query strings.
         index_prefix: Path prefix for the FAISS index files.
-        top_k: Number of top chunks to retrieve initially.
-        output_k: Number of chunks to include in final output.
+        top_k: Number of top chunks to retrieve initially per query.
+        output_k: Number of chunks to include in each final output.
         no_cache: If True, skip semantic caching.
-        token_limit: Maximum token count for the final output.
+        token_limit: Maximum token count for each final output.
         quiet: If True, suppress progress output.
 
     Returns:
-        Refined context string containing relevant code and information.
+        One refined context string per query, in input order.
     """
 
-    print(f"Query: {query}")
-
     # Load index
 
     if not quiet:
@@ -44,83 +100,108 @@ def query_context(
 
     index = faiss.read_index(f"{index_prefix}/index.faiss")
 
-    with open(f"{index_prefix}/chunks.pkl", "rb") as f:
-        chunks = pickle.load(f)
-
-    # Strip non-ASCII characters from all chunks to prevent encoding issues
-    def strip_non_ascii(text):
-        if isinstance(text, str):
-            return ''.join(char for char in text if ord(char) < 128)
-        return text
+    # Large indexes are built as HNSW; widen the search beam beyond the
+    # default for better recall at negligible latency cost
+    if hasattr(index, "hnsw"):
+        index.hnsw.efSearch = 64
 
-    for chunk in chunks:
-        if isinstance(chunk, dict):
-            # Strip from text
-            if 'text' in chunk:
-                chunk['text'] = strip_non_ascii(chunk['text'])
-            # Strip from metadata fields
-            if 'metadata' in chunk and isinstance(chunk['metadata'], dict):
-                for key, value in chunk['metadata'].items():
-                    if isinstance(value, str):
-                        chunk['metadata'][key] = strip_non_ascii(value)
+    chunks = _load_chunks(index_prefix)
 
-    with open(f"{index_prefix}/meta.json", "r") as f:
-        meta = json.load(f)
+    with open(f"{index_prefix}/meta.json", "rb") as f:
+        meta = orjson.loads(f.read())
 
     print(f"Index: {meta['total_chunks']} chunks")
 
-    # Embed query
+    # Embed queries in one batch
 
     if not quiet:
-        print("Embedding query...")
-
-    query_emb = embed_single(query, model=EMBEDDING_MODEL)
+        print("Embedding queries..." if len(queries) > 1 else "Embedding query...")
 
-    query_emb = np.array(query_emb, dtype="float32")
+    query_embs = np.asarray(embed_texts(queries, model=EMBEDDING_MODEL), dtype="float32")
+    faiss.normalize_L2(query_embs)
 
-    query_emb = query_emb.reshape(
-        1, -1
-    )  # Reshape to (1, d) for normalization and search
-    faiss.normalize_L2(query_emb)
-
-    # Search
+    # Search all queries at once
 
     if not quiet:
         print(f"Searching (top-{top_k})...")
 
-    scores, indices = index.search(query_emb, top_k)
+    scores, indices = index.search(query_embs, top_k)
+
+    outputs = []
+    for b, query in enumerate(queries):
+        print(f"Query: {query}")
 
-    # Filter low scores
-    results = []
+        # Filter low scores with one C-level mask instead of looping over
+        # NumPy scalars. Relaxed threshold to allow more potential matches
+        # for the reranker; FAISS pads short result lists with -1 indices,
+        # so drop those
+        mask = (scores[b] > 0.3) & (indices[b] >= 0)
+        results = []
 
-    for i, idx in enumerate(indices[0]):
-        # Relaxed threshold to allow more potential matches for the reranker
-        if scores[0][i] > 0.3:
+        for idx, score in zip(indices[b][mask].tolist(), scores[b][mask].tolist()):
             chunk = chunks[idx]
-            chunk["score"] = float(scores[0][i])
+            chunk["score"] = score
             results.append(chunk)
 
-    print(f"Found {len(results)} relevant chunks")
+        print(f"Found {len(results)} relevant chunks")
 
-    if not results:
-        return "No relevant context found."
+        if not results:
+            outputs.append("No relevant context found.")
+            continue
 
-    # Check cache
+        # Check cache
 
-    cached = check_cache(query, results[:5]) if not no_cache else None
+        cached = check_cache(query, results[:5]) if not no_cache else None
 
-    if cached:
-        return cached
+        if cached:
+            outputs.append(cached)
+            continue
 
-    # Rerank + extract
+        # Rerank + extract
 
-    if not quiet:
-        print("Reranking with LLM...")
+        if not quiet:
+            print("Reranking with LLM...")
+
+        refined = rerank_and_extract(results, query, index_prefix, output_k, token_limit=token_limit)
+
+        # Cache result
+
+        store_cache(query, results[:5], refined) if not no_cache else None
 
-    refined = rerank_and_extract(results, query, index_prefix, output_k, token_limit=token_limit)
+        outputs.append(refined)
 
-    # Cache result
+    return outputs
 
-    store_cache(query, results[:5], refined) if not no_cache else None
 
-    return refined
+def query_context(
+    query: str,
+    index_prefix: str,
+    top_k: int = 20,
+    output_k: int = 5,
+    no_cache: bool = False,
+    token_limit: int = 15000,
+    quiet: bool = False,
+):
+    """Main query pipeline for retrieving context from indexed repository.
+
+    Args:
+        query: The search query string.
+        index_prefix: Path prefix for the FAISS index files.
+        top_k: Number of top chunks to retrieve initially.
+        output_k: Number of chunks to include in final output.
+        no_cache: If True, skip semantic caching.
+        token_limit: Maximum token count for the final output.
+        quiet: If True, suppress progress output.
+
+    Returns:
+        Refined context string containing relevant code and information.
+    """
+    return query_context_batch(
+        [query],
+        index_prefix,
+        top_k=top_k,
+        output_k=output_k,
+        no_cache=no_cache,
+        token_limit=token_limit,
+        quiet=quiet,
+    )[0]
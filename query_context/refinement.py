@@ -1,14 +1,40 @@
 """Refinement functionality for query context."""
 
-import tiktoken
+from functools import lru_cache
 from typing import Dict, List
 
+import numpy as np
+
 from config.config import SUMMARIZATION_MODEL, generate_text
-from indexer.chunk_storage import load_full_chunk
-from .rendering import _render_context_sections
+from indexer.chunk_storage import load_full_chunks
+from .rendering import _render_section_list
 from .reranking import _score_chunks_with_model, _select_rerank_candidates
 
 
+# Precomputed header templates; %-formatting a fixed-shape template is
+# cheaper than rebuilding the f-string per chunk in the prompt loop
+_CODE_HEADER = "[Chunk %d] %s lines %s-%s"
+_FILE_HEADER = "[Chunk %d] File Summary: %s"
+_FOLDER_HEADER = "[Chunk %d] Folder: %s"
+_DOC_HEADER = "[Chunk %d] Document: %s"
+
+
+@lru_cache(maxsize=1)
+def _get_encoding():
+    """Lazily import tiktoken and build the encoding on first use.
+
+    Importing tiktoken loads its Rust extension and parses the encoding
+    ranks, so defer that cost until a caller actually needs to count
+    tokens.
+
+    Returns:
+        The cl100k_base tiktoken encoding.
+    """
+    import tiktoken
+
+    return tiktoken.get_encoding("cl100k_base")
+
+
 def _count_tokens(text: str) -> int:
     """Count tokens in a text string using tiktoken.
 
@@ -18,8 +44,7 @@ def _count_tokens(text: str) -> int:
     Returns:
         Number of tokens in the text.
     """
-    encoding = tiktoken.get_encoding("cl100k_base")
-    return len(encoding.encode(text))
+    return len(_get_encoding().encode(text))
 
 
 def _build_refinement_prompt(
@@ -31,7 +56,7 @@ def _build_refinement_prompt(
         query: The original search query.
         top_chunks: List of top-scoring chunks for reference.
         index_prefix: Path prefix for loading full chunk code.
-        word_limit: Maximum word count for the final output.
+        token_limit: Maximum token count for the final output.
 
     Returns:
         Formatted prompt string for LLM context refinement.
@@ -41,14 +66,41 @@ def _build_refinement_prompt(
     current_token_count = 0
     chunk_details = []
 
+    # Prefetch all full chunk bodies concurrently instead of one read per loop
+    # iteration. Bodies are truncated to 1500 chars below, so cap the read at
+    # 1800 bytes (margin for multibyte sequences) instead of decoding whole
+    # files only to throw most of them away.
+    body_metadata = [
+        chunk["metadata"]
+        for chunk in top_chunks
+        if chunk["metadata"].get("level") in ("code_chunk", "document")
+    ]
+    loaded_chunks = load_full_chunks(
+        (metadata.get("chunk_id") for metadata in body_metadata),
+        index_prefix,
+        max_bytes=1800,
+        paths={
+            metadata.get("chunk_id"): metadata.get("full_code_path")
+            for metadata in body_metadata
+        },
+    )
+
     for i, chunk in enumerate(top_chunks):
         metadata = chunk["metadata"]
         level = metadata.get("level")
 
         # Build chunk header
         chunk_content = ""
+        # Token count of the chunk body when it was precomputed at index time
+        # and the body is included verbatim (no truncation)
+        body_tokens = None
         if level == "code_chunk":
-            header = f"[Chunk {i}] {metadata['file']} lines {metadata.get('start_line', '?')}-{metadata.get('end_line', '?')}"
+            header = _CODE_HEADER % (
+                i,
+                metadata["file"],
+                metadata.get("start_line", "?"),
+                metadata.get("end_line", "?"),
+            )
             func_name = metadata.get("function_name", "unknown")
             if func_name != "unknown":
                 header += f" | Function: {func_name}"
@@ -56,35 +108,48 @@ def _build_refinement_prompt(
             # Load the actual code
             chunk_id = metadata.get("chunk_id")
             if chunk_id:
-                code = load_full_chunk(chunk_id, index_prefix)
+                code = loaded_chunks[chunk_id]
                 # Truncate very long chunks to keep prompt manageable
                 if len(code) > 1500:
                     code = code[:1500] + "\n... (truncated)"
+                else:
+                    body_tokens = metadata.get("token_count")
                 chunk_content = f"{header}\n```\n{code}\n```"
             else:
                 chunk_content = f"{header}\n(Code not available)"
 
         elif level == "file_summary":
-            header = f"[Chunk {i}] File Summary: {metadata['file']}"
+            header = _FILE_HEADER % (i, metadata["file"])
             chunk_content = f"{header}\n{chunk['text']}"
         elif level == "folder_summary":
-            header = f"[Chunk {i}] Folder: {metadata.get('folder', '?')}"
+            header = _FOLDER_HEADER % (i, metadata.get("folder", "?"))
             chunk_content = f"{header}\n{chunk['text']}"
         elif level == "document":
-            header = f"[Chunk {i}] Document: {metadata['file']}"
+            header = _DOC_HEADER % (i, metadata["file"])
             chunk_id = metadata.get("chunk_id")
             if chunk_id:
-                content = load_full_chunk(chunk_id, index_prefix)
+                content = loaded_chunks[chunk_id]
                 if len(content) > 1500:
                     content = content[:1500] + "\n... (truncated)"
+                else:
+                    body_tokens = metadata.get("token_count")
                 chunk_content = f"{header}\n```\n{content}\n```"
             else:
                 chunk_content = f"{header}\n{chunk['text'][:500]}"
         else:
             chunk_content = f"[Chunk {i}] {chunk['text'][:200]}..."
 
-        # Check if adding this chunk would exceed the limit
-        chunk_tokens = _count_tokens(chunk_content)
+        # Check if adding this chunk would exceed the limit. When the body
+        # tokens were precomputed during indexing, only the short
+        # header/fence wrapper still needs tokenizing here. Otherwise start
+        # from a cheap ~4-chars-per-token estimate and only run the exact
+        # encoder when the estimate lands near the remaining budget.
+        if body_tokens is not None:
+            chunk_tokens = body_tokens + _count_tokens(f"{header}\n```\n\n```")
+        else:
+            chunk_tokens = len(chunk_content) // 4
+            if current_token_count + chunk_tokens > max_chunk_tokens:
+                chunk_tokens = _count_tokens(chunk_content)
         if current_token_count + chunk_tokens > max_chunk_tokens:
             break
 
@@ -119,35 +184,55 @@ def rerank_and_extract(
         query: The search query.
         index_prefix: Path prefix for the FAISS index files (needed to load full code).
         top_k: Number of top chunks to include in final context.
-        word_limit: Maximum word count for the final output.
+        token_limit: Maximum token count for the final output.
 
     Returns:
         Refined context string with essential information extracted by LLM.
     """
 
     rerank_chunks = _select_rerank_candidates(chunks)
-    scored_chunks = _score_chunks_with_model(rerank_chunks, query)
-    scored_chunks.sort(reverse=True, key=lambda item: item[0])
-    top_chunks = [chunk for _, chunk in scored_chunks[:top_k]]
+    if not rerank_chunks:
+        return "query invalid, no related chunks found\nTry with a different query. Or search for context yourself"
+    if len(rerank_chunks) <= top_k:
+        # Nothing to rank: every candidate makes the cut, so skip the LLM round-trip
+        top_chunks = rerank_chunks
+    else:
+        scored_chunks = _score_chunks_with_model(rerank_chunks, query)
+        if len(scored_chunks) > top_k:
+            # O(N) argpartition picks the top_k, then only those few get
+            # sorted - no Python-level key lambda per comparison
+            scores = np.fromiter(
+                (score for score, _ in scored_chunks),
+                dtype=np.float32,
+                count=len(scored_chunks),
+            )
+            top_idx = np.argpartition(-scores, top_k)[:top_k]
+            top_idx = top_idx[np.argsort(-scores[top_idx])]
+            top_chunks = [scored_chunks[i][1] for i in top_idx]
+        else:
+            scored_chunks.sort(reverse=True, key=lambda item: item[0])
+            top_chunks = [chunk for _, chunk in scored_chunks]
     if not top_chunks:
         return "query invalid, no related chunks found\nTry with a different query. Or search for context yourself"
     refine_prompt = _build_refinement_prompt(query, top_chunks, index_prefix, token_limit)
 
+    # Render each chunk section once; the success path, the fit-loop, and the
+    # fallback all reuse these strings instead of re-loading from disk
+    rendered_sections = _render_section_list(top_chunks, index_prefix)
+
     try:
         refined_text = generate_text(
             refine_prompt,
             model=SUMMARIZATION_MODEL,
             options={"temperature": 0.2},
         )
-        rendered_chunks = _render_context_sections(top_chunks, index_prefix)
-        combined = refined_text.strip() + "\n\n" + rendered_chunks
-        encoding = tiktoken.get_encoding("cl100k_base")
+        combined = refined_text.strip() + "\n\n" + "\n\n---\n\n".join(rendered_sections)
+        encoding = _get_encoding()
         tokens = len(encoding.encode(combined))
         if tokens > token_limit:
             # Reduce chunks until under limit
             for i in range(len(top_chunks) - 1, -1, -1):
-                reduced_chunks = top_chunks[:i + 1]
-                rendered_reduced = _render_context_sections(reduced_chunks, index_prefix)
+                rendered_reduced = "\n\n---\n\n".join(rendered_sections[: i + 1])
                 combined_reduced = refined_text.strip() + "\n\n" + rendered_reduced
                 tokens_reduced = len(encoding.encode(combined_reduced))
                 if tokens_reduced <= token_limit:
@@ -157,4 +242,4 @@ def rerank_and_extract(
         return combined
 
     except Exception:
-        return _render_context_sections(top_chunks, index_prefix)
+        return "\n\n---\n\n".join(rendered_sections)
@@ -2,20 +2,33 @@
 
 from typing import Dict, List, Optional
 
-from indexer.chunk_storage import load_full_chunk
+from indexer.chunk_storage import load_full_chunk, load_full_chunks
 
 
-def _load_chunk_content(chunk_id: str, index_prefix: Optional[str]) -> str:
-    """Load full chunk content if available."""
+def _load_chunk_content(
+    metadata: Dict,
+    index_prefix: Optional[str],
+    preloaded: Optional[Dict[str, str]] = None,
+) -> str:
+    """Load full chunk content if available, preferring preloaded content."""
+    chunk_id = metadata.get("chunk_id")
+    if chunk_id and preloaded is not None and chunk_id in preloaded:
+        return preloaded[chunk_id]
     if chunk_id and index_prefix:
-        return load_full_chunk(chunk_id, index_prefix)
+        return load_full_chunk(
+            chunk_id, index_prefix, full_code_path=metadata.get("full_code_path")
+        )
     return "[Content not available]"
 
 
-def _render_code_chunk(chunk: Dict, index_prefix: Optional[str]) -> str:
+def _render_code_chunk(
+    chunk: Dict,
+    index_prefix: Optional[str],
+    preloaded: Optional[Dict[str, str]] = None,
+) -> str:
     """Render a code chunk section."""
     metadata = chunk["metadata"]
-    full_code = _load_chunk_content(metadata.get("chunk_id"), index_prefix)
+    full_code = _load_chunk_content(metadata, index_prefix, preloaded)
 
     location = (
         f"Function: {metadata.get('function_name', 'unknown')}, "
@@ -26,36 +39,51 @@ def _render_code_chunk(chunk: Dict, index_prefix: Optional[str]) -> str:
     return f"**{location}**\n```\n{full_code}\n```"
 
 
-def _render_file_summary(chunk: Dict, index_prefix: Optional[str] = None) -> str:
+def _render_file_summary(
+    chunk: Dict,
+    index_prefix: Optional[str] = None,
+    preloaded: Optional[Dict[str, str]] = None,
+) -> str:
     """Render a file summary section."""
     metadata = chunk["metadata"]
     return f"**File Summary: {metadata['file']}**\n{chunk['text']}"
 
 
-def _render_folder_summary(chunk: Dict, index_prefix: Optional[str] = None) -> str:
+def _render_folder_summary(
+    chunk: Dict,
+    index_prefix: Optional[str] = None,
+    preloaded: Optional[Dict[str, str]] = None,
+) -> str:
     """Render a folder summary section."""
     metadata = chunk["metadata"]
     return f"**Folder: {metadata.get('folder', '?')}**\n{chunk['text']}"
 
 
-def _render_document(chunk: Dict, index_prefix: Optional[str]) -> str:
+def _render_document(
+    chunk: Dict,
+    index_prefix: Optional[str],
+    preloaded: Optional[Dict[str, str]] = None,
+) -> str:
     """Render a document section."""
     metadata = chunk["metadata"]
-    full_content = _load_chunk_content(metadata.get("chunk_id"), index_prefix)
+    full_content = _load_chunk_content(metadata, index_prefix, preloaded)
     return f"**Document: {metadata['file']}**\n```\n{full_content}\n```"
 
 
-def _render_context_sections(
+def _render_section_list(
     top_chunks: List[Dict], index_prefix: Optional[str] = None
-) -> str:
-    """Format the top chunks into a combined context string.
+) -> List[str]:
+    """Render each top chunk into its own context section.
+
+    Rendering to a list lets callers join arbitrary prefixes of the
+    sections without re-loading chunk files or re-building strings.
 
     Args:
         top_chunks: List of top-scoring chunks to format.
         index_prefix: Path prefix for the FAISS index files (needed to load full code).
 
     Returns:
-        Formatted context string with file locations and code blocks.
+        One formatted section string per chunk.
     """
     renderers = {
         "code_chunk": _render_code_chunk,
@@ -64,13 +92,46 @@ def _render_context_sections(
         "document": _render_document,
     }
 
+    # Prefetch all full chunk bodies concurrently before rendering; the
+    # stored full_code_path lets each load open its file directly
+    preloaded = None
+    if index_prefix:
+        body_metadata = [
+            chunk["metadata"]
+            for chunk in top_chunks
+            if chunk["metadata"].get("level") in ("code_chunk", "document")
+        ]
+        preloaded = load_full_chunks(
+            (metadata.get("chunk_id") for metadata in body_metadata),
+            index_prefix,
+            paths={
+                metadata.get("chunk_id"): metadata.get("full_code_path")
+                for metadata in body_metadata
+            },
+        )
+
     sections = []
     for chunk in top_chunks:
         level = chunk["metadata"].get("level")
         renderer = renderers.get(level)
         if renderer:
-            sections.append(renderer(chunk, index_prefix))
+            sections.append(renderer(chunk, index_prefix, preloaded))
         else:
             sections.append(f"**{chunk['text']}**")
 
-    return "\n\n---\n\n".join(sections)
+    return sections
+
+
+def _render_context_sections(
+    top_chunks: List[Dict], index_prefix: Optional[str] = None
+) -> str:
+    """Format the top chunks into a combined context string.
+
+    Args:
+        top_chunks: List of top-scoring chunks to format.
+        index_prefix: Path prefix for the FAISS index files (needed to load full code).
+
+    Returns:
+        Formatted context string with file locations and code blocks.
+    """
+    return "\n\n---\n\n".join(_render_section_list(top_chunks, index_prefix))
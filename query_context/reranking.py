@@ -1,7 +1,10 @@
 """Reranking functionality for query context."""
 
 import sys
-from typing import Dict, List
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Tuple
+
+import orjson
 
 from config.config import (
     SUMMARIZATION_MODEL,
@@ -11,8 +14,45 @@ from config.config import (
 )
 from .models import ChunkRanking
 
+# Precomputed header templates; %-formatting a fixed-shape template is
+# cheaper than rebuilding the f-string per chunk in the prompt loop
+_CODE_HEADER = "[Chunk %d] Function: %s File: %s (lines %s-%s)"
+_FILE_HEADER = "[Chunk %d] File Summary: %s"
+_FOLDER_HEADER = "[Chunk %d] Folder: %s"
+_DOC_HEADER = "[Chunk %d] Document: %s"
+_PLAIN_HEADER = "[Chunk %d]"
+_RERANK_USER_TEMPLATE = 'Query: "%s"\n\nChunks to rank:\n\n%s'
+
+# Built once; pydantic regenerates the schema dict on every
+# model_json_schema() call
+_CHUNK_RANKING_SCHEMA = ChunkRanking.model_json_schema()
+
+# Candidates per rerank LLM call; larger batches degrade scoring
+# consistency, so oversized candidate sets are scored in concurrent calls
+_RERANK_BATCH_SIZE = 16
+
+# Token budget for the chunk sections of one rerank prompt; oversized
+# chunk bodies are truncated rather than letting the request blow the
+# model's context window and fail
+_MAX_RERANK_PROMPT_TOKENS = 8000
+
+# Static scoring rubric sent as the system message. Keeping it
+# byte-identical across requests lets providers with prompt caching
+# serve the shared prefix from cache; only the query and chunks vary
+_RERANK_SYSTEM_PROMPT = (
+    "Rate the relevance (0-10) of each chunk to the given query.\n\n"
+    "Score based on:\n"
+    "- How directly the function/file relates to the query topic\n"
+    "- Whether the metadata (function name, file path, documentation) matches the query\n"
+    "- Use your judgment, but do not infer what the code does beyond what's stated\n\n"
+    'Provide rankings as JSON with "id" (the integer from each chunk header) '
+    'and "score" (number 0-10, one decimal).\n'
+    "Return ONLY valid JSON, no other text:\n"
+    '{"rankings": [{"id": 0, "score": 8.5}, {"id": 1, "score": 3.2}]}'
+)
+
 
-def _select_rerank_candidates(chunks: List[Dict]) -> List[Dict]:
+def _select_rerank_candidates(chunks: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
     """Select the subset of chunks to rerank with the language model.
 
     Args:
@@ -21,89 +61,152 @@ def _select_rerank_candidates(chunks: List[Dict]) -> List[Dict]:
     Returns:
         First 25 chunks to be reranked by the LLM.
     """
-    return chunks[:25]
+    # Only copy when there is actually something to trim; callers treat
+    # the result as read-only
+    return chunks if len(chunks) <= 25 else chunks[:25]
 
 
-def _build_rerank_prompt(rerank_chunks: List[Dict], query: str) -> str:
-    """Create the reranking prompt from chunk metadata.
+def _build_rerank_prompt(
+    rerank_chunks: List[Dict[str, Any]],
+    query: str,
+    max_prompt_tokens: int = _MAX_RERANK_PROMPT_TOKENS,
+) -> str:
+    """Create the dynamic (query + chunks) portion of the rerank prompt.
+
+    The static scoring rubric lives in _RERANK_SYSTEM_PROMPT and is sent
+    as the system message. Chunk bodies are included greedily against a
+    token budget; a chunk that would overflow it is truncated instead of
+    dropped, so every candidate still gets scored.
 
     Args:
         rerank_chunks: Chunks to be reranked by the LLM.
         query: The original search query.
+        max_prompt_tokens: Token budget for the chunk sections.
 
     Returns:
-        Formatted prompt string for LLM reranking.
+        Formatted user-message string for LLM reranking.
     """
     chunk_sections = []
+    budget = max_prompt_tokens
     for index, chunk in enumerate(rerank_chunks):
         metadata = chunk["metadata"]
-        header = f"[Chunk {index}]"
-        level = metadata.get("level")
+        # One bound-method lookup instead of a LOAD_METHOD + call per
+        # .get in the header cascade
+        get = metadata.get
+        level = get("level")
         if level == "code_chunk":
-            header += (
-                f" Function: {metadata.get('function_name', '?')} "
-                f"File: {metadata['file']} "
-                f"(lines {metadata.get('start_line', '?')}-{metadata.get('end_line', '?')})"
+            header = _CODE_HEADER % (
+                index,
+                get("function_name", "?"),
+                metadata["file"],
+                get("start_line", "?"),
+                get("end_line", "?"),
             )
         elif level == "file_summary":
-            header += f" File Summary: {metadata['file']}"
+            header = _FILE_HEADER % (index, metadata["file"])
         elif level == "folder_summary":
-            header += f" Folder: {metadata.get('folder', '?')}"
+            header = _FOLDER_HEADER % (index, get("folder", "?"))
         elif level == "document":
-            header += f" Document: {metadata['file']}"
-        chunk_sections.append(f"{header}\n{chunk['text']}\n")
-
-    combined_chunks = "\n---\n".join(chunk_sections)
-    max_index = max(len(rerank_chunks) - 1, 0)
-    return (
-        f'Rate the relevance (0-10) of each chunk to the query: "{query}"\n\n'
-        "Score based on:\n"
-        "- How directly the function/file relates to the query topic\n"
-        "- Whether the metadata (function name, file path, documentation) matches the query\n"
-        "- Use your judgment, but do not infer what the code does beyond what's stated\n\n"
-        f"Chunks to rank:\n\n{combined_chunks}\n"
-        f'Provide rankings as JSON with "chunk_id" (integer; 0-{max_index}) and "score" (number 0-10).\n'
-        "Return ONLY valid JSON:\n"
-        '{"rankings": [{"chunk_id": 0, "score": 8.5}, {"chunk_id": 1, "score": 3.2}]}'
-    )
-
-
-def _score_chunks_with_model(rerank_chunks: List[Dict], query: str) -> List[tuple]:
+            header = _DOC_HEADER % (index, metadata["file"])
+        else:
+            header = _PLAIN_HEADER % index
+
+        # token_count was measured on the full code body at index time,
+        # but for code chunks the prompt carries the short metadata
+        # description instead - charging the body's tokens would exhaust
+        # the budget on text that never enters the prompt. Only trust
+        # the stored count where the counted body is what's included
+        # (document chunks); otherwise estimate at ~4 chars per token so
+        # no tokenizer runs in this hot path
+        text = chunk["text"]
+        if level == "document":
+            text_tokens = get("token_count") or len(text) // 4 + 1
+        else:
+            text_tokens = len(text) // 4 + 1
+        if text_tokens > budget:
+            text = text[: max(budget, 50) * 4] + "\n... (truncated)"
+            text_tokens = budget
+        budget -= text_tokens
+        chunk_sections.append(f"{header}\n{text}\n")
+
+    return _RERANK_USER_TEMPLATE % (query, "\n---\n".join(chunk_sections))
+
+
+def _score_chunks_with_model(
+    rerank_chunks: List[Dict[str, Any]], query: str
+) -> List[Tuple[float, Dict[str, Any]]]:
     """Score chunks using the active provider.
 
+    Candidate sets beyond _RERANK_BATCH_SIZE are split into batches that
+    are scored in concurrent LLM calls, keeping each prompt inside the
+    size regime where ranking quality holds up.
+
     Args:
         rerank_chunks: Chunks to be scored by the LLM.
         query: The original search query.
 
     Returns:
-        List of tuples containing (score, chunk) pairs.
+        List of (score, chunk) pairs.
+    """
+    if len(rerank_chunks) <= _RERANK_BATCH_SIZE:
+        return _score_batch(rerank_chunks, query)
+
+    batches = [
+        rerank_chunks[i : i + _RERANK_BATCH_SIZE]
+        for i in range(0, len(rerank_chunks), _RERANK_BATCH_SIZE)
+    ]
+    with ThreadPoolExecutor(max_workers=len(batches)) as executor:
+        batch_results = executor.map(lambda batch: _score_batch(batch, query), batches)
+    return [pair for batch_scores in batch_results for pair in batch_scores]
+
+
+def _score_batch(
+    rerank_chunks: List[Dict[str, Any]], query: str
+) -> List[Tuple[float, Dict[str, Any]]]:
+    """Score one batch of chunks with a single LLM call.
+
+    Args:
+        rerank_chunks: Chunks to be scored by the LLM.
+        query: The original search query.
+
+    Returns:
+        List of (score, chunk) pairs.
     """
     prompt = _build_rerank_prompt(rerank_chunks, query)
     try:
         response_format = build_structured_output_format(
-            ChunkRanking.model_json_schema(), schema_name="chunk_ranking"
+            _CHUNK_RANKING_SCHEMA, schema_name="chunk_ranking"
         )
         response = chat_completion(
-            messages=[{"role": "user", "content": prompt}],
+            messages=[
+                {"role": "system", "content": _RERANK_SYSTEM_PROMPT},
+                {"role": "user", "content": prompt},
+            ],
             model=SUMMARIZATION_MODEL,
             response_format=response_format,
-            options={"temperature": 0.1},
+            options={
+                "temperature": 0.1,
+                # Roughly a dozen tokens per ranking item; the cap keeps a
+                # rambling model from serializing anything beyond the JSON
+                "max_tokens": 12 * len(rerank_chunks) + 20,
+            },
         )
         content = extract_chat_content(response)
         if not content:
             return [(5.0, chunk) for chunk in rerank_chunks]
+        # The response already conforms to the schema, so read the fields
+        # directly rather than paying for pydantic model construction
+        scored: List[tuple] = []
         try:
-            ranking_data = ChunkRanking.model_validate_json(content)
+            for ranking in orjson.loads(content)["rankings"]:
+                chunk_id = int(ranking["id"])
+                score = float(ranking["score"])
+                if 0 <= chunk_id < len(rerank_chunks):
+                    scored.append((score, rerank_chunks[chunk_id]))
+                    print(f"Chunk {chunk_id}: Score {score}", file=sys.stderr)
         except Exception:
             print("JSON parsing failed for ranking response, using default scores", file=sys.stderr)
             return [(5.0, chunk) for chunk in rerank_chunks]
-        scored: List[tuple] = []
-        for ranking in ranking_data.rankings:
-            chunk_id = ranking.chunk_id
-            score = ranking.score
-            if 0 <= chunk_id < len(rerank_chunks):
-                scored.append((float(score), rerank_chunks[chunk_id]))
-                print(f"Chunk {chunk_id}: Score {score}", file=sys.stderr)
         return scored if scored else [(5.0, chunk) for chunk in rerank_chunks]
 
     except Exception as exc: